@@ -0,0 +1,33 @@
+"""Add pg_trgm index on profile strain names for fuzzy search
+
+Revision ID: 3c1f9a7d2b64
+Revises: 8fe68fa46d2c
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f9a7d2b64'
+down_revision: Union[str, None] = '8fe68fa46d2c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_profiles_strain_normalized_trgm',
+        'profiles',
+        ['strain_normalized'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'strain_normalized': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_profiles_strain_normalized_trgm', table_name='profiles', postgresql_using='gin')
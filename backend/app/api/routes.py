@@ -1,16 +1,21 @@
+import asyncio
 import hashlib
 import logging
 from fastapi import APIRouter, HTTPException, Query
 from app.models.schemas import (
     AnalyzeUrlRequest, AnalyzeUrlResponse, TerpeneInfo,
     AnalyzeStrainRequest, StrainSearchResult, StrainSearchResponse,
-    EffectsAnalysis, Evidence, DataAvailability, Totals,
+    Evidence, DataAvailability, Totals,
 )
 from app.services.analyzer import StrainAnalyzer
 from app.services.cache import cache_service
+from app.services.cannlytics_client import CannlyticsClient
+from app.services.effects_engine import generate_effects_analysis
 from app.services.profile_cache import profile_cache_service
 from app.services.classifier import classify_terpene_profile, generate_summary, generate_cannabinoid_insights, get_traditional_label
 from app.core.config import settings
+from app.utils.urls import canonicalize_url
+from app.core.constants import MAJOR_CANNABINOID_FIELDS, COUNTED_CANNABINOID_FIELDS
 
 logger = logging.getLogger(__name__)
 
@@ -91,8 +96,8 @@ async def analyze_url(request: AnalyzeUrlRequest):
     """
     url_str = str(request.url)
 
-    # Check cache first
-    cache_key = f"analysis:{hashlib.md5(url_str.encode()).hexdigest()}"
+    # Check cache first (keyed by canonical URL so tracking params/fragments share an entry)
+    cache_key = f"analysis:{hashlib.sha1(canonicalize_url(url_str).encode()).hexdigest()}"
     cached = await cache_service.get(cache_key)
 
     if cached:
@@ -141,13 +146,13 @@ async def get_version():
 @router.get("/strains/autocomplete")
 async def autocomplete_strains(q: str = Query(..., min_length=2), limit: int = Query(10, le=50)):
     """Fast prefix-only strain name autocomplete."""
-    results = profile_cache_service.autocomplete_strains(q, limit=limit)
+    results = await asyncio.to_thread(profile_cache_service.autocomplete_strains, q, limit=limit)
     return results
 
 @router.get("/strains/search", response_model=StrainSearchResponse)
 async def search_strains(q: str = Query(..., min_length=1), limit: int = Query(20, le=100)):
     """Search strains with prefix match + fuzzy matching."""
-    results = profile_cache_service.search_strains(q, limit=limit)
+    results = await asyncio.to_thread(profile_cache_service.search_strains, q, limit=limit)
     return StrainSearchResponse(
         results=[StrainSearchResult(**r) for r in results],
         total=len(results),
@@ -166,7 +171,7 @@ async def analyze_strain(request: AnalyzeStrainRequest):
 
     try:
         # Look up in DB
-        cached_result = profile_cache_service.get_full_cached_result(strain_name)
+        cached_result = await asyncio.to_thread(profile_cache_service.get_full_cached_result, strain_name)
         if not cached_result:
             raise HTTPException(status_code=404, detail=f"Strain '{strain_name}' not found in database")
 
@@ -191,15 +196,13 @@ async def analyze_strain(request: AnalyzeStrainRequest):
 
         # Data availability
         has_terpenes = bool(terpenes)
-        has_cannabinoids = any(getattr(totals, f, None) for f in ['thc', 'thca', 'cbd', 'cbda', 'cbn', 'cbg', 'cbc'])
+        totals_values = totals.__dict__ if totals else {}
+        has_cannabinoids = any(totals_values.get(f) for f in MAJOR_CANNABINOID_FIELDS)
 
         # Generate effects profile
         effects = None
         if has_terpenes and terpenes:
-            from app.services.effects_engine import generate_effects_profile
-            effects_data = generate_effects_profile(terpenes, totals, category)
-            if effects_data:
-                effects = EffectsAnalysis(**effects_data)
+            effects = generate_effects_analysis(terpenes, totals, category)
 
         result = AnalyzeUrlResponse(
             sources=["database"],
@@ -218,8 +221,7 @@ async def analyze_strain(request: AnalyzeStrainRequest):
                 has_cannabinoids=has_cannabinoids,
                 has_coa=False,
                 terpene_count=len(terpenes) if terpenes else 0,
-                cannabinoid_count=sum(1 for f in ['thc', 'thca', 'thcv', 'cbd', 'cbda', 'cbdv', 'cbn', 'cbg', 'cbc', 'cbcv']
-                                      if getattr(totals, f, None)),
+                cannabinoid_count=sum(1 for f in COUNTED_CANNABINOID_FIELDS if totals_values.get(f)),
             ),
             cannabinoid_insights=cannabinoid_insights,
             effects=effects,
@@ -242,9 +244,6 @@ async def test_strain_lookup(strain_name: str):
     Test endpoint: Look up a strain directly by name using Cannlytics API.
     Bypasses scraping to verify API integration and classification pipeline.
     """
-    from app.services.cannlytics_client import CannlyticsClient
-    from app.services.classifier import classify_terpene_profile, generate_summary, generate_cannabinoid_insights
-
     try:
         client = CannlyticsClient()
         strain_data = await client.get_strain_data(strain_name)
@@ -1,13 +1,17 @@
 # Shared constants used across multiple services.
 # Centralizes terpene/cannabinoid mappings, classification thresholds,
 # and strain name normalization data to prevent duplication.
+# Mapping tables are read-only views (MappingProxyType) so no parser can
+# mutate the shared tables by accident.
+
+from types import MappingProxyType
 
 # ---------------------------------------------------------------------------
 # Terpene field mapping: source API/CSV field names -> standard internal names
 # Used by cannlytics_client.py and init_datasets.py parsers
 # ---------------------------------------------------------------------------
 
-TERPENE_FIELD_MAP = {
+TERPENE_FIELD_MAP = MappingProxyType({
     'beta_myrcene': 'myrcene',
     'myrcene': 'myrcene',
     'd_limonene': 'limonene',
@@ -30,14 +34,14 @@ TERPENE_FIELD_MAP = {
     'alpha_terpinene': 'alpha_terpinene',
     'gamma_terpinene': 'gamma_terpinene',
     'caryophyllene_oxide': 'caryophyllene_oxide',
-}
+})
 
 # ---------------------------------------------------------------------------
 # Cannabinoid field mapping: source API/CSV field names -> standard internal names
 # Used by cannlytics_client.py and init_datasets.py parsers
 # ---------------------------------------------------------------------------
 
-CANNABINOID_FIELD_MAP = {
+CANNABINOID_FIELD_MAP = MappingProxyType({
     'thc': 'thc',
     'delta_9_thc': 'thc',
     'total_thc': 'thc',
@@ -59,7 +63,65 @@ CANNABINOID_FIELD_MAP = {
     'cbt': 'cbt',
     'cbl': 'cbl',
     'total_terpenes': 'total_terpenes',
-}
+})
+
+# ---------------------------------------------------------------------------
+# COA analyte names (lowercased) -> standard internal names
+# Exact-match fast path for cannlytics_client.py COA parsing; names not listed
+# here fall back to substring matching on COA_TERPENE_TOKENS.
+# ---------------------------------------------------------------------------
+
+COA_TERPENE_ANALYTE_MAP = MappingProxyType({
+    'myrcene': 'myrcene',
+    'beta-myrcene': 'myrcene',
+    'β-myrcene': 'myrcene',
+    'limonene': 'limonene',
+    'd-limonene': 'limonene',
+    'caryophyllene': 'caryophyllene',
+    'beta-caryophyllene': 'caryophyllene',
+    'β-caryophyllene': 'caryophyllene',
+    'trans-caryophyllene': 'caryophyllene',
+    'alpha-pinene': 'alpha_pinene',
+    'α-pinene': 'alpha_pinene',
+    'beta-pinene': 'beta_pinene',
+    'β-pinene': 'beta_pinene',
+    'terpinolene': 'terpinolene',
+    'humulene': 'humulene',
+    'alpha-humulene': 'humulene',
+    'α-humulene': 'humulene',
+    'linalool': 'linalool',
+    'ocimene': 'ocimene',
+    'beta-ocimene': 'ocimene',
+    'β-ocimene': 'ocimene',
+})
+
+# Substring tokens searched for in COA analyte names missing from the map above
+# (pinene is split into alpha/beta by the caller)
+COA_TERPENE_TOKENS = (
+    ('myrcene', 'myrcene'),
+    ('limonene', 'limonene'),
+    ('caryophyllene', 'caryophyllene'),
+    ('pinene', 'pinene'),
+    ('terpinolene', 'terpinolene'),
+    ('humulene', 'humulene'),
+    ('linalool', 'linalool'),
+    ('ocimene', 'ocimene'),
+)
+
+# COA cannabinoid analytes are matched exactly
+COA_CANNABINOID_ANALYTE_MAP = MappingProxyType({
+    'thc': 'thc',
+    'delta-9-thc': 'thc',
+    'thca': 'thca',
+    'cbd': 'cbd',
+    'cbda': 'cbda',
+    'total terpenes': 'total_terpenes',
+})
+
+# Cannabinoid fields that signal "has cannabinoid data" / are counted for
+# DataAvailability.cannabinoid_count (used by analyzer.py and routes.py)
+MAJOR_CANNABINOID_FIELDS = ('thc', 'thca', 'cbd', 'cbda', 'cbn', 'cbg', 'cbc')
+COUNTED_CANNABINOID_FIELDS = ('thc', 'thca', 'thcv', 'cbd', 'cbda', 'cbdv', 'cbn', 'cbg', 'cbc', 'cbcv')
 
 # ---------------------------------------------------------------------------
 # Classification thresholds (used by classifier.py)
@@ -74,16 +136,73 @@ YELLOW_THRESHOLD = 0.30      # Limonene >= this → YELLOW
 RED_BALANCED_MIN = 0.20      # Each of myrcene/limonene/caryophyllene >= this for RED
 RED_PINENE_MAX = 0.15        # Pinene <= this for RED
 RED_HUMULENE_MAX = 0.15      # Humulene <= this for RED
+RED_BALANCE_TOLERANCE = 0.15  # Each of myrcene/limonene/caryophyllene within this of their mean for RED
 
 # Fallback threshold for dominance detection via top-terpene comparison
 DOMINANCE_MARGIN = 0.10
 
+# Memoized classify/summary results kept per process
+CLASSIFIER_CACHE_MAXSIZE = 4096
+
+# Memoized effects profiles kept per process (used by effects_engine.py)
+EFFECTS_CACHE_MAXSIZE = 4096
+
 # ---------------------------------------------------------------------------
 # Data completeness thresholds (used by analyzer.py)
 # ---------------------------------------------------------------------------
 
 MIN_TERPENES_FOR_COMPLETE = 5
 
+# ---------------------------------------------------------------------------
+# In-process profile cache (used by profile_cache.py)
+# ---------------------------------------------------------------------------
+
+PROFILE_CACHE_MAXSIZE = 2048
+PROFILE_CACHE_TTL_SECONDS = 300
+
+# Strains with no stored profile are remembered for a shorter window
+PROFILE_NEGATIVE_CACHE_MAXSIZE = 4096
+PROFILE_NEGATIVE_CACHE_TTL_SECONDS = 60
+
+# Trigram-index shortlist size rescored by fuzzy strain search
+SEARCH_FUZZY_CANDIDATES = 200
+
+# In-process cache of strain API lookups (used by cannlytics_client.py, otreeba_client.py)
+STRAIN_API_CACHE_MAXSIZE = 1024
+STRAIN_API_CACHE_TTL_SECONDS = 3600
+
+# Strain API misses are remembered for a shorter window (used by otreeba_client.py)
+STRAIN_API_NEGATIVE_CACHE_MAXSIZE = 4096
+STRAIN_API_NEGATIVE_CACHE_TTL_SECONDS = 300
+
+# In-process copy of the bulk Kushy strain table (used by kushy_client.py)
+KUSHY_STRAINS_CACHE_TTL_SECONDS = 3600
+
+# Redis copies of parsed upstream responses (COAs, strain API); strain entries
+# older than STRAIN_API_CACHE_TTL_SECONDS are revalidated with their ETag
+UPSTREAM_REDIS_TTL_SECONDS = 86400
+
+# Max concurrent upstream requests per batch lookup (used by otreeba_client.py)
+UPSTREAM_BATCH_CONCURRENCY = 20
+
+# Max concurrent requests to the Otreeba host across all lookups
+OTREEBA_MAX_CONCURRENCY = 10
+
+# Retries for rate-limited/transient upstream failures (used by otreeba_client.py):
+# exponential backoff with jitter from BASE, each wait capped at MAX
+UPSTREAM_RETRY_ATTEMPTS = 3
+UPSTREAM_RETRY_BASE_SECONDS = 0.5
+UPSTREAM_RETRY_MAX_SECONDS = 8.0
+
+# ---------------------------------------------------------------------------
+# Database connection pool (used by db/base.py); sized for the worker threads
+# that run blocking profile queries
+# ---------------------------------------------------------------------------
+
+DB_POOL_SIZE = 20
+DB_MAX_OVERFLOW = 10
+DB_POOL_RECYCLE_SECONDS = 1800
+
 # ---------------------------------------------------------------------------
 # Strain name normalization suffixes
 # Shared between analyzer.py and profile_cache.py
@@ -20,7 +20,7 @@ from typing import Dict, List, Optional
 from sqlalchemy.orm import Session
 from app.db.base import SessionLocal
 from app.db.models import Profile
-from app.services.classifier import classify_terpene_profile
+from app.services.classifier import classify_terpene_profiles
 from app.models.schemas import Totals
 from app.core.constants import TERPENE_FIELD_MAP, CANNABINOID_FIELD_MAP
 from app.utils.conversions import safe_float, safe_terpene_value
@@ -565,8 +565,11 @@ def import_strains_to_db(strains: List[Dict], source: str = 'dataset_import',
     imported_count = 0
     skipped_count = 0
 
+    # Classify every profile up front in one batch (duplicates classified once)
+    categories = classify_terpene_profiles(s['terpenes'] for s in strains)
+
     try:
-        for strain_data in strains:
+        for strain_data, category in zip(strains, categories):
             strain_name = strain_data['name']
             terpenes = strain_data['terpenes']
             totals = strain_data['totals']
@@ -587,8 +590,8 @@ def import_strains_to_db(strains: List[Dict], source: str = 'dataset_import',
                 skipped_count += 1
                 continue
 
-            # Classify terpene profile
-            category = classify_terpene_profile(terpenes) if terpenes else None
+            if not terpenes:
+                category = None
 
             # Convert Totals model to dict
             try:
@@ -1,9 +1,23 @@
+import orjson
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.constants import DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE_SECONDS
 
-engine = create_engine(settings.database_url)
+# One pooled engine per process: SessionLocal() checks a connection out of this
+# pool rather than opening a new one. pre_ping drops connections the server has
+# closed, and recycle retires them before idle timeouts do.
+# JSON columns (terp_vector, totals, provenance) are decoded with orjson
+# instead of the driver's stdlib json on every row read.
+engine = create_engine(
+    settings.database_url,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    pool_recycle=DB_POOL_RECYCLE_SECONDS,
+    json_deserializer=orjson.loads,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
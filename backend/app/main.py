@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -6,6 +7,8 @@ from app.core.config import settings
 from app.core.middleware import RateLimitMiddleware
 from app.api import routes
 from app.services.cache import cache_service
+from app.services.http_client import close_http_client
+from app.services.profile_cache import profile_cache_service
 
 # Configure logging
 logging.basicConfig(
@@ -16,11 +19,13 @@ logging.basicConfig(
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Connect to Redis
+    # Startup: Connect to Redis and load the strain alias map off the event loop
     await cache_service.connect()
+    await asyncio.to_thread(profile_cache_service.warm)
     yield
-    # Shutdown: Disconnect from Redis
+    # Shutdown: Disconnect from Redis and close pooled upstream HTTP connections
     await cache_service.disconnect()
+    await close_http_client()
 
 app = FastAPI(
     title="TerpTracker API",
@@ -65,6 +65,13 @@ class EffectsAnalysis(BaseModel):
     onset: str = ""
     peak: str = ""
     duration: str = ""
+    # Numeric bounds (minutes) behind the onset/peak/duration strings
+    onset_min: Optional[int] = None
+    onset_max: Optional[int] = None
+    peak_min: Optional[int] = None
+    peak_max: Optional[int] = None
+    duration_min: Optional[int] = None
+    duration_max: Optional[int] = None
     best_contexts: List[str] = Field(default_factory=list)
     potential_negatives: List[str] = Field(default_factory=list)
     terpene_interactions: List[str] = Field(default_factory=list)
@@ -10,22 +10,45 @@ Main analyzer service that coordinates the extraction pipeline:
 *Otreeba currently disabled - enable in config when ready
 """
 
+import asyncio
 import logging
 from typing import Dict, List
-from app.core.constants import MIN_TERPENES_FOR_COMPLETE
-from app.models.schemas import AnalyzeUrlResponse, EffectsAnalysis, Evidence, Totals, DataAvailability
+from app.core.constants import MIN_TERPENES_FOR_COMPLETE, MAJOR_CANNABINOID_FIELDS, COUNTED_CANNABINOID_FIELDS
+from app.db import base as db_base
+from app.db.models import Extraction
+from app.models.schemas import AnalyzeUrlResponse, Evidence, Totals, DataAvailability
 from app.services.scraper import scrape_url
 from app.services.cannlytics_client import CannlyticsClient
 from app.services.kushy_client import kushy_client
 from app.services.classifier import classify_terpene_profile, generate_summary, generate_cannabinoid_insights, get_traditional_label
+from app.services.effects_engine import generate_effects_analysis
 from app.services.profile_cache import profile_cache_service
 from app.utils.normalization import normalize_strain_name
-from app.utils.merging import merge_terpene_data, merge_cannabinoid_data
+from app.utils.merging import merge_terpene_data, merge_cannabinoid_data, sources_from_mask, SOURCE_PRIORITY
 from app.utils.matching import fuzzy_match_strain
 
 logger = logging.getLogger(__name__)
 
 
+def _record_extraction(url: str, source: str, evidence: dict) -> None:
+    """Insert an Extraction row (blocking; run via asyncio.to_thread)."""
+    db = db_base.SessionLocal()
+    try:
+        extraction = Extraction(
+            url=url,
+            source_used=source,
+            status='completed',
+            evidence=evidence,
+        )
+        db.add(extraction)
+        db.commit()
+        logger.debug("Recorded extraction for '%s'", url)
+    except Exception:
+        db.rollback()
+    finally:
+        db.close()
+
+
 class StrainAnalyzer:
     """Main service for analyzing strain URLs and extracting terpene profiles."""
 
@@ -97,7 +120,10 @@ class StrainAnalyzer:
         # Step 3: Always check database cache for supplemental data (with alias resolution)
         if strain_name:
             logger.debug("Checking database for '%s'...", strain_name)
-            cached_profile = profile_cache_service.get_cached_profile_with_aliases(strain_name)
+            # Blocking DB lookup runs in a worker thread so the event loop stays free
+            cached_profile = await asyncio.to_thread(
+                profile_cache_service.get_cached_profile_with_aliases, strain_name
+            )
             if cached_profile:
                 logger.debug("Found cached profile for '%s'", strain_name)
                 if cached_profile['terpenes']:
@@ -107,8 +133,8 @@ class StrainAnalyzer:
                 cached_at = cached_profile.get('cached_at')
 
         # Step 4: Check if we need API supplementation
-        preliminary_terpenes, _ = merge_terpene_data(coa_terpenes, page_terpenes, db_terpenes, {})
-        preliminary_totals, _ = merge_cannabinoid_data(coa_totals, page_totals, db_totals, Totals())
+        preliminary_terpenes, prelim_terp_sources = merge_terpene_data(coa_terpenes, page_terpenes, db_terpenes, {})
+        preliminary_totals, prelim_cannabinoid_sources = merge_cannabinoid_data(coa_totals, page_totals, db_totals, Totals())
 
         if not self.is_data_complete(preliminary_terpenes, preliminary_totals):
             logger.debug("Data incomplete (terpenes: %d, need %d+), querying APIs...", len(preliminary_terpenes), MIN_TERPENES_FOR_COMPLETE)
@@ -146,20 +172,17 @@ class StrainAnalyzer:
             logger.debug("Data complete (terpenes: %d), skipping API calls", len(preliminary_terpenes))
 
         # Step 5: Merge all data sources with priority rules
-        logger.debug("Merging data from all sources...")
-        merged_terpenes, terp_sources = merge_terpene_data(coa_terpenes, page_terpenes, db_terpenes, api_terpenes)
-        merged_totals, cannabinoid_sources = merge_cannabinoid_data(coa_totals, page_totals, db_totals, api_totals)
-
-        # Combine sources used (maintain order)
-        all_sources = []
-        if 'coa' in terp_sources or 'coa' in cannabinoid_sources:
-            all_sources.append('coa')
-        if 'page' in terp_sources or 'page' in cannabinoid_sources:
-            all_sources.append('page')
-        if 'database' in terp_sources or 'database' in cannabinoid_sources:
-            all_sources.append('database')
-        if 'api' in terp_sources or 'api' in cannabinoid_sources:
-            all_sources.append('api')
+        # (the preliminary merge is already final when no API data was added)
+        if api_source:
+            logger.debug("Merging data from all sources...")
+            merged_terpenes, terp_sources = merge_terpene_data(coa_terpenes, page_terpenes, db_terpenes, api_terpenes)
+            merged_totals, cannabinoid_sources = merge_cannabinoid_data(coa_totals, page_totals, db_totals, api_totals)
+        else:
+            merged_terpenes, terp_sources = preliminary_terpenes, prelim_terp_sources
+            merged_totals, cannabinoid_sources = preliminary_totals, prelim_cannabinoid_sources
+
+        # Combine sources used (maintain priority order)
+        all_sources = sources_from_mask(terp_sources | cannabinoid_sources)
 
         if not all_sources:
             all_sources = ['page']
@@ -168,8 +191,8 @@ class StrainAnalyzer:
 
         # Calculate data availability
         has_terpenes = bool(merged_terpenes)
-        has_cannabinoids = any([merged_totals.thc, merged_totals.thca, merged_totals.cbd, merged_totals.cbda,
-                                merged_totals.cbn, merged_totals.cbg, merged_totals.cbc])
+        totals_values = merged_totals.__dict__
+        has_cannabinoids = any(totals_values.get(f) for f in MAJOR_CANNABINOID_FIELDS)
         has_coa = 'coa' in all_sources
 
         if not has_terpenes and not has_cannabinoids:
@@ -183,10 +206,10 @@ class StrainAnalyzer:
 
         # Step 7: Save merged results to database for future lookups
         if merged_terpenes and category and strain_name:
-            source_priority = ['coa', 'page', 'database', 'api']
-            primary_source = next((s for s in source_priority if s in all_sources), 'unknown')
+            primary_source = next((s for s in SOURCE_PRIORITY if s in all_sources), 'unknown')
             logger.debug("Saving merged result to database for '%s' (primary source: %s)", strain_name, primary_source)
-            profile_cache_service.save_profile(
+            await asyncio.to_thread(
+                profile_cache_service.save_profile,
                 strain_name=strain_name,
                 terpenes=merged_terpenes,
                 totals=merged_totals,
@@ -235,43 +258,21 @@ class StrainAnalyzer:
             has_cannabinoids=has_cannabinoids,
             has_coa=has_coa,
             terpene_count=len(merged_terpenes) if merged_terpenes else 0,
-            cannabinoid_count=sum(1 for field in ['thc', 'thca', 'thcv', 'cbd', 'cbda', 'cbdv',
-                                                    'cbn', 'cbg', 'cbc', 'cbcv']
-                                  if getattr(merged_totals, field, None))
+            cannabinoid_count=sum(1 for f in COUNTED_CANNABINOID_FIELDS if totals_values.get(f))
         )
 
         # Step 11: Record extraction history (fire-and-forget)
         if merged_terpenes and category and strain_name:
             try:
-                from app.db.base import SessionLocal
-                from app.db.models import Extraction
-                source_priority = ['coa', 'page', 'database', 'api']
-                primary_source = next((s for s in source_priority if s in all_sources), 'unknown')
-                db = SessionLocal()
-                try:
-                    extraction = Extraction(
-                        url=url,
-                        source_used=primary_source,
-                        status='completed',
-                        evidence=evidence_data,
-                    )
-                    db.add(extraction)
-                    db.commit()
-                    logger.debug("Recorded extraction for '%s'", url)
-                except Exception:
-                    db.rollback()
-                finally:
-                    db.close()
+                primary_source = next((s for s in SOURCE_PRIORITY if s in all_sources), 'unknown')
+                await asyncio.to_thread(_record_extraction, url, primary_source, evidence_data)
             except Exception as e:
                 logger.debug("Failed to record extraction (non-blocking): %s", e)
 
         # Step 12: Generate effects profile
         effects = None
         if has_terpenes:
-            from app.services.effects_engine import generate_effects_profile
-            effects_data = generate_effects_profile(merged_terpenes, merged_totals, category)
-            if effects_data:
-                effects = EffectsAnalysis(**effects_data)
+            effects = generate_effects_analysis(merged_terpenes, merged_totals, category)
 
         return AnalyzeUrlResponse(
             sources=all_sources,
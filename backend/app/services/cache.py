@@ -2,8 +2,8 @@
 Redis-based caching and rate limiting service.
 """
 
-import json
 import logging
+import msgpack
 import redis.asyncio as redis
 from typing import Optional, Any
 from datetime import timedelta
@@ -20,10 +20,10 @@ class CacheService:
     async def connect(self):
         """Initialize Redis connection."""
         try:
+            # Binary mode: cached values are msgpack-encoded bytes
             self.redis = await redis.from_url(
                 settings.redis_url,
-                encoding="utf-8",
-                decode_responses=True
+                decode_responses=False
             )
             # Test connection
             await self.redis.ping()
@@ -44,7 +44,7 @@ class CacheService:
         try:
             value = await self.redis.get(key)
             if value:
-                return json.loads(value)
+                return msgpack.unpackb(value, raw=False)
         except Exception as e:
             logger.error("Cache get error", exc_info=True)
 
@@ -56,14 +56,14 @@ class CacheService:
 
         Args:
             key: Cache key
-            value: Value to cache (will be JSON serialized)
+            value: Value to cache (will be msgpack serialized)
             ttl: Time to live in seconds (default 15 minutes)
         """
         if not self.redis:
             return
 
         try:
-            serialized = json.dumps(value)
+            serialized = msgpack.packb(value, use_bin_type=True)
             await self.redis.setex(key, ttl, serialized)
         except Exception as e:
             logger.error("Cache set error", exc_info=True)
@@ -4,17 +4,112 @@ Client for Cannlytics API:
 - Strain Data API for fallback strain information
 """
 
+import asyncio
+import hashlib
 import logging
+import re
+import time
 import urllib.parse
+from functools import lru_cache
+from types import MappingProxyType
 import httpx
-from typing import Optional, Dict, List
+import orjson
+from typing import Optional, Dict, List, Tuple
 from app.core.config import settings
-from app.core.constants import TERPENE_FIELD_MAP, CANNABINOID_FIELD_MAP
+from app.core.constants import (
+    TERPENE_FIELD_MAP, CANNABINOID_FIELD_MAP,
+    COA_TERPENE_ANALYTE_MAP, COA_TERPENE_TOKENS, COA_CANNABINOID_ANALYTE_MAP,
+    STRAIN_API_CACHE_MAXSIZE, STRAIN_API_CACHE_TTL_SECONDS,
+    UPSTREAM_REDIS_TTL_SECONDS,
+)
 from app.models.schemas import COAData, StrainAPIData, Totals
+from app.services.cache import cache_service
+from app.services.http_client import get_http_client
 from app.utils.conversions import safe_terpene_value
+from app.utils.ttl_cache import TTLCache
+from app.utils.urls import canonicalize_url
 
 logger = logging.getLogger(__name__)
 
+# Targets returned by resolve_coa_analyte
+ANALYTE_TERPENE = "terpene"
+ANALYTE_TOTALS = "totals"
+
+# All fallback terpene tokens compiled into one alternation so a noisy analyte
+# name is scanned once instead of once per token
+_COA_TOKEN_KEYS = dict(COA_TERPENE_TOKENS)
+_COA_TOKEN_RE = re.compile("|".join(re.escape(token) for token, _ in COA_TERPENE_TOKENS))
+
+# Strain API field -> (target, standard key), terpenes first then cannabinoids.
+# Later entries win when several API fields map to the same key, as before.
+_STRAIN_FIELD_MAP = MappingProxyType({
+    **{api_key: (ANALYTE_TERPENE, std_key) for api_key, std_key in TERPENE_FIELD_MAP.items()},
+    **{api_key: (ANALYTE_TOTALS, std_key) for api_key, std_key in CANNABINOID_FIELD_MAP.items()},
+})
+
+# Cannabinoids that make a strain response worth returning without terpenes
+_PRESENCE_CANNABINOIDS = frozenset({'thc', 'cbd', 'cbn', 'cbg'})
+
+# Response keys holding the display name, in order of preference
+_COA_NAME_FIELDS = ("product_name", "strain_name")
+_STRAIN_NAME_FIELDS = ("strain_name", "name")
+
+# Failures an upstream call can raise: transport errors, bad JSON (orjson and
+# pydantic errors are ValueErrors) and unexpected payload shapes. Anything else,
+# including cancellation, propagates.
+_UPSTREAM_ERRORS = (httpx.HTTPError, ValueError, TypeError, KeyError, AttributeError)
+
+# Process-wide cache of found strains (CannlyticsClient is created per request)
+_strain_cache = TTLCache(maxsize=STRAIN_API_CACHE_MAXSIZE, ttl=STRAIN_API_CACHE_TTL_SECONDS)
+
+
+@lru_cache(maxsize=1024)
+def resolve_coa_analyte(analyte: str) -> Optional[Tuple[str, str]]:
+    """
+    Map a lowercased COA analyte name to (target, standard_key).
+
+    target is ANALYTE_TERPENE (terpene dict key) or ANALYTE_TOTALS (Totals field).
+    Known names resolve with one dict lookup; noisy names like
+    "β-caryophyllene (bcp)" fall back to a single scan for known terpene
+    tokens (first token found in the name wins). Results are
+    memoized since labs reuse the same analyte names across COAs.
+    """
+    std_key = COA_TERPENE_ANALYTE_MAP.get(analyte)
+    if std_key:
+        return ANALYTE_TERPENE, std_key
+    std_key = COA_CANNABINOID_ANALYTE_MAP.get(analyte)
+    if std_key:
+        return ANALYTE_TOTALS, std_key
+
+    token_match = _COA_TOKEN_RE.search(analyte)
+    if token_match:
+        std_key = _COA_TOKEN_KEYS[token_match.group()]
+        if std_key != 'pinene':
+            return ANALYTE_TERPENE, std_key
+        if "alpha" in analyte or "α" in analyte:
+            return ANALYTE_TERPENE, "alpha_pinene"
+        if "beta" in analyte or "β" in analyte:
+            return ANALYTE_TERPENE, "beta_pinene"
+        return None
+
+    if "total" in analyte and "terpene" in analyte:
+        return ANALYTE_TOTALS, "total_terpenes"
+    return None
+
+
+@lru_cache(maxsize=4096)
+def encode_strain_name(name: str) -> str:
+    """
+    URL-encode a strain name for the strain API path.
+
+    Plain ASCII names like "Blue Dream" only need spaces swapped for '+';
+    anything else goes through quote_plus. Memoized since strain names repeat.
+    """
+    if name.isascii() and name.replace(" ", "").isalnum():
+        return name.replace(" ", "+")
+    return urllib.parse.quote_plus(name)
+
+
 class CannlyticsClient:
     """Client for interacting with Cannlytics APIs."""
 
@@ -30,6 +125,9 @@ class CannlyticsClient:
         """
         Parse a COA using Cannlytics COA Data Extraction API.
 
+        Parsed COAs are cached in Redis by canonical URL, since a published
+        certificate does not change and extraction is the slowest upstream call.
+
         Args:
             coa_url: URL or path to COA PDF/document
 
@@ -39,160 +137,233 @@ class CannlyticsClient:
         if not self.api_key:
             return None
 
+        redis_key = f"coa:{hashlib.sha1(canonicalize_url(coa_url).encode()).hexdigest()}"
+        cached = await cache_service.get(redis_key)
+        if cached is not None:
+            logger.debug("COA cache hit for %s", coa_url)
+            return COAData.model_validate(cached)
+
+        coa = await self._fetch_coa(coa_url)
+        if coa is not None:
+            await cache_service.set(redis_key, coa.model_dump(), ttl=UPSTREAM_REDIS_TTL_SECONDS)
+        return coa
+
+    async def _fetch_coa(self, coa_url: str) -> Optional[COAData]:
+        """Extract and parse a COA through the Cannlytics API (uncached)."""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                # Cannlytics COA extraction endpoint
-                response = await client.post(
-                    f"{self.base_url}/coa/extract",
-                    json={"url": coa_url},
-                    headers=self.headers
-                )
-
-                if response.status_code != 200:
-                    return None
-
-                data = response.json()
-
-                # Parse results array for terpene data
-                terpenes = {}
-                totals = Totals()
-                strain_name = None
-                lab_name = None
-                test_date = None
-                batch_id = None
-
-                # Extract from response structure
-                # Note: Actual structure depends on Cannlytics API response format
-                if "results" in data:
-                    results = data["results"]
-
-                    # Extract terpenes
-                    for result in results:
-                        analyte = result.get("name", "").lower()
-                        value = result.get("value")
-
-                        if value is not None:
-                            # Map common terpene names
-                            if "myrcene" in analyte:
-                                terpenes["myrcene"] = float(value)
-                            elif "limonene" in analyte:
-                                terpenes["limonene"] = float(value)
-                            elif "caryophyllene" in analyte:
-                                terpenes["caryophyllene"] = float(value)
-                            elif "pinene" in analyte:
-                                if "alpha" in analyte or "α" in analyte:
-                                    terpenes["alpha_pinene"] = float(value)
-                                elif "beta" in analyte or "β" in analyte:
-                                    terpenes["beta_pinene"] = float(value)
-                            elif "terpinolene" in analyte:
-                                terpenes["terpinolene"] = float(value)
-                            elif "humulene" in analyte:
-                                terpenes["humulene"] = float(value)
-                            elif "linalool" in analyte:
-                                terpenes["linalool"] = float(value)
-                            elif "ocimene" in analyte:
-                                terpenes["ocimene"] = float(value)
-
-                            # Cannabinoids
-                            elif analyte == "thc" or analyte == "delta-9-thc":
-                                totals.thc = float(value)
-                            elif analyte == "thca":
-                                totals.thca = float(value)
-                            elif analyte == "cbd":
-                                totals.cbd = float(value)
-                            elif analyte == "cbda":
-                                totals.cbda = float(value)
-                            elif "total" in analyte and "terpene" in analyte:
-                                totals.total_terpenes = float(value)
-
-                # Extract metadata
-                strain_name = data.get("product_name") or data.get("strain_name")
-                lab_name = data.get("lab", {}).get("name")
-                test_date = data.get("date_tested")
-                batch_id = data.get("batch_id")
-
-                if not terpenes:
-                    return None
-
-                return COAData(
-                    strain_name=strain_name,
-                    terpenes=terpenes,
-                    totals=totals,
-                    lab_name=lab_name,
-                    test_date=test_date,
-                    batch_id=batch_id
-                )
-
-        except Exception as e:
+            # Cannlytics COA extraction endpoint (shared pooled client)
+            client = get_http_client()
+            response = await client.post(
+                f"{self.base_url}/coa/extract",
+                json={"url": coa_url},
+                headers=self.headers,
+                timeout=30.0
+            )
+
+            if response.status_code != 200:
+                return None
+
+            # orjson decodes the buffered body in one C pass; only "results"
+            # and four metadata keys are read from it
+            data = orjson.loads(response.content)
+
+            # Nothing to extract: bail out before building any models
+            # Note: Actual structure depends on Cannlytics API response format
+            results = data.get("results") if isinstance(data, dict) else None
+            if not results:
+                return None
+
+            # Collect terpenes and cannabinoids; Totals is built once at the end
+            terpenes = {}
+            totals_values = {}
+            for result in results:
+                value = result.get("value")
+                if value is None:
+                    continue
+
+                match = resolve_coa_analyte(result.get("name", "").lower())
+                if match is None:
+                    continue
+
+                target, std_key = match
+                if target == ANALYTE_TERPENE:
+                    terpenes[std_key] = float(value)
+                else:
+                    totals_values[std_key] = float(value)
+
+            if not terpenes:
+                return None
+
+            # Extract metadata
+            strain_name = next((data[k] for k in _COA_NAME_FIELDS if data.get(k)), None)
+            lab_name = (data.get("lab") or {}).get("name")
+            test_date = data.get("date_tested")
+            batch_id = data.get("batch_id")
+            totals = Totals(**totals_values)
+
+            return COAData(
+                strain_name=strain_name,
+                terpenes=terpenes,
+                totals=totals,
+                lab_name=lab_name,
+                test_date=test_date,
+                batch_id=batch_id
+            )
+
+        except _UPSTREAM_ERRORS:
             logger.error("COA parsing error", exc_info=True)
             return None
 
+    async def parse_coa_batch(self, coa_urls: List[str]) -> List[Optional[COAData]]:
+        """
+        Parse several COAs concurrently over the shared HTTP/2 client.
+
+        Args:
+            coa_urls: URLs or paths to COA PDFs/documents
+
+        Returns:
+            COAData (or None on failure) for each URL, in input order
+        """
+        results = await asyncio.gather(
+            *(self.parse_coa(url) for url in coa_urls), return_exceptions=True
+        )
+        return [None if isinstance(r, BaseException) else r for r in results]
+
     async def get_strain_data(self, strain_name: str) -> Optional[StrainAPIData]:
         """
         Get strain terpene data from Cannlytics Strain Data API.
 
+        Found strains are cached in-process (keyed by the exact, stripped name
+        since the API lookup is case-sensitive), so repeat lookups skip the
+        network round trip.
+
         Args:
             strain_name: Name of the strain to look up
 
         Returns:
             StrainAPIData with average terpene profile, or None if not found
         """
+        cache_key = strain_name.strip()
+        cached = _strain_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("Strain data cache hit for '%s'", cache_key)
+            return cached
+
+        # Shared Redis copy: fresh entries skip the request entirely, stale ones
+        # are revalidated with their ETag so an unchanged strain costs a 304
+        redis_key = f"strain_api:{cache_key}"
+        entry = await cache_service.get(redis_key)
+        if entry is not None and time.time() - entry["fetched_at"] < STRAIN_API_CACHE_TTL_SECONDS:
+            strain_data = StrainAPIData.model_validate(entry["data"])
+            _strain_cache.set(cache_key, strain_data)
+            return strain_data
+
+        strain_data, etag = await self._fetch_strain_data(strain_name, cached_entry=entry)
+        if strain_data is not None:
+            _strain_cache.set(cache_key, strain_data)
+            await cache_service.set(
+                redis_key,
+                {"etag": etag, "fetched_at": time.time(), "data": strain_data.model_dump()},
+                ttl=UPSTREAM_REDIS_TTL_SECONDS,
+            )
+        return strain_data
+
+    async def get_strain_data_batch(self, strain_names: List[str]) -> List[Optional[StrainAPIData]]:
+        """
+        Look up several strains concurrently over the shared HTTP/2 client.
+
+        Args:
+            strain_names: Names of the strains to look up
+
+        Returns:
+            StrainAPIData (or None if not found) for each name, in input order
+        """
+        results = await asyncio.gather(
+            *(self.get_strain_data(name) for name in strain_names), return_exceptions=True
+        )
+        return [None if isinstance(r, BaseException) else r for r in results]
+
+    async def _fetch_strain_data(
+        self, strain_name: str, cached_entry: Optional[dict] = None
+    ) -> Tuple[Optional[StrainAPIData], Optional[str]]:
+        """
+        Fetch and parse strain data from the Cannlytics API.
+
+        When cached_entry carries an ETag the request is conditional, and a
+        304 Not Modified returns the cached data without reading a body.
+
+        Returns:
+            Tuple of (StrainAPIData or None, response ETag or None)
+        """
         try:
             # URL encode the strain name
-            encoded_name = urllib.parse.quote_plus(strain_name)
+            encoded_name = encode_strain_name(strain_name)
 
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                # Cannlytics strain data endpoint (no auth required for public data)
-                url = f"https://cannlytics.com/api/data/strains/{encoded_name}"
-                logger.debug("Fetching strain data from: %s", url)
+            # Cannlytics strain data endpoint (no auth required for public data)
+            url = f"https://cannlytics.com/api/data/strains/{encoded_name}"
+            logger.debug("Fetching strain data from: %s", url)
 
-                response = await client.get(url)
+            headers = {}
+            if cached_entry and cached_entry.get("etag"):
+                headers["If-None-Match"] = cached_entry["etag"]
 
-                if response.status_code != 200:
-                    logger.debug("Strain API returned status %s", response.status_code)
-                    return None
+            client = get_http_client()
+            response = await client.get(url, headers=headers)
 
-                result = response.json()
+            if response.status_code == 304 and cached_entry:
+                logger.debug("Strain data not modified for '%s'", strain_name)
+                return StrainAPIData.model_validate(cached_entry["data"]), cached_entry["etag"]
+
+            if response.status_code != 200:
+                logger.debug("Strain API returned status %s", response.status_code)
+                return None, None
+
+            result = orjson.loads(response.content)
+            if logger.isEnabledFor(logging.DEBUG):
                 logger.debug("Strain API response: %s", list(result.keys()) if isinstance(result, dict) else "not a dict")
 
-                # Response format: {"data": {...}}
-                if not result or "data" not in result:
-                    logger.debug("No 'data' key in response")
-                    return None
-
-                strain = result["data"]
-
-                # Extract terpene averages
-                terpenes = {}
-                for api_key, std_key in TERPENE_FIELD_MAP.items():
-                    if api_key in strain and strain[api_key] is not None:
-                        val = safe_terpene_value(strain[api_key])
-                        if val is not None:
-                            terpenes[std_key] = val
-
-                # Extract cannabinoid data
-                totals = Totals()
-                for api_key, std_key in CANNABINOID_FIELD_MAP.items():
-                    if api_key in strain and strain[api_key] is not None:
-                        val = safe_terpene_value(strain[api_key])
-                        if val is not None:
-                            setattr(totals, std_key, val)
-
-                # Return data even if no terpenes found (cannabinoids might be present)
-                if not terpenes and not any([totals.thc, totals.cbd, totals.cbn, totals.cbg]):
-                    logger.debug("No terpene or cannabinoid data found in strain response")
-                    return None
-
-                logger.info("Extracted %s terpenes and cannabinoid data from API", len(terpenes))
-
-                return StrainAPIData(
-                    strain_name=strain.get("strain_name") or strain.get("name", strain_name),
-                    terpenes=terpenes,
-                    totals=totals,
-                    match_score=1.0,  # Exact match assumed
-                    source="cannlytics"
-                )
-
-        except Exception as e:
+            # Response format: {"data": {...}}
+            if not result or "data" not in result:
+                logger.debug("No 'data' key in response")
+                return None, None
+
+            strain = result["data"]
+
+            # Project only the mapped keys out of the response; values for
+            # Totals are collected first so the model is built once
+            terpenes = {}
+            totals_values = {}
+            has_cannabinoid = False
+            for api_key, (target, std_key) in _STRAIN_FIELD_MAP.items():
+                raw = strain.get(api_key)
+                if raw is None:
+                    continue
+                val = safe_terpene_value(raw)
+                if val is None:
+                    continue
+                if target == ANALYTE_TERPENE:
+                    terpenes[std_key] = val
+                else:
+                    totals_values[std_key] = val
+                    if std_key in _PRESENCE_CANNABINOIDS:
+                        has_cannabinoid = True
+
+            # Return data even if no terpenes found (cannabinoids might be present)
+            if not terpenes and not has_cannabinoid:
+                logger.debug("No terpene or cannabinoid data found in strain response")
+                return None, None
+
+            logger.info("Extracted %s terpenes and cannabinoid data from API", len(terpenes))
+
+            strain_data = StrainAPIData(
+                strain_name=next((strain[k] for k in _STRAIN_NAME_FIELDS if strain.get(k)), strain_name),
+                terpenes=terpenes,
+                totals=Totals(**totals_values),
+                match_score=1.0,  # Exact match assumed
+                source="cannlytics"
+            )
+            return strain_data, response.headers.get("etag")
+
+        except _UPSTREAM_ERRORS:
             logger.error("Strain API error", exc_info=True)
-            return None
+            return None, None
@@ -10,23 +10,37 @@ Categories:
 - RED: Myrcene + Limonene + Caryophyllene in roughly equal amounts; low Pinene/Humulene
 """
 
-from typing import Dict, Tuple, List
+import heapq
+import sys
+from bisect import bisect_left
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, Iterable, Sequence, Tuple, List
 from app.core.constants import (
     ORANGE_THRESHOLD, GREEN_THRESHOLD, BLUE_THRESHOLD,
     PURPLE_CARYOPHYLLENE_MIN, PURPLE_PINENE_MAX,
-    YELLOW_THRESHOLD, RED_BALANCED_MIN, RED_PINENE_MAX, RED_HUMULENE_MAX,
-    DOMINANCE_MARGIN,
+    YELLOW_THRESHOLD, RED_BALANCED_MIN, RED_PINENE_MAX, RED_HUMULENE_MAX, RED_BALANCE_TOLERANCE,
+    DOMINANCE_MARGIN, CLASSIFIER_CACHE_MAXSIZE, TERPENE_FIELD_MAP,
 )
 
+# SDP category names; interned so lookups with categories loaded at runtime
+# (e.g. from the database) match the table keys by identity
+BLUE = sys.intern("BLUE")
+YELLOW = sys.intern("YELLOW")
+PURPLE = sys.intern("PURPLE")
+GREEN = sys.intern("GREEN")
+ORANGE = sys.intern("ORANGE")
+RED = sys.intern("RED")
+
 # Traditional label mappings from SDP "Beyond Indica & Sativa" research
 # Reference: https://straindataproject.org/beyond-indica-and-sativa
 TRADITIONAL_LABELS = {
-    "ORANGE": "Sativa",
-    "YELLOW": "Modern Indica",
-    "PURPLE": "Modern Indica",
-    "GREEN": "Classic Indica",
-    "BLUE": "Classic Indica",
-    "RED": "Hybrid",
+    ORANGE: "Sativa",
+    YELLOW: "Modern Indica",
+    PURPLE: "Modern Indica",
+    GREEN: "Classic Indica",
+    BLUE: "Classic Indica",
+    RED: "Hybrid",
 }
 
 def get_traditional_label(category: str) -> str:
@@ -34,40 +48,61 @@ def get_traditional_label(category: str) -> str:
 
 # Category descriptions for summaries
 CATEGORY_DESCRIPTIONS = {
-    "BLUE": "myrcene-forward with an earthy, relaxing profile",
-    "YELLOW": "limonene-forward with bright, citrus-leaning aroma and an upbeat profile",
-    "PURPLE": "caryophyllene-forward with spicy, peppery notes and a balanced profile",
-    "GREEN": "pinene-forward with sharp, pine-like aroma and an alert profile",
-    "ORANGE": "terpinolene-forward with complex, floral, and citrus notes",
-    "RED": "balanced myrcene-limonene-caryophyllene with a versatile, hybrid profile"
+    BLUE: "myrcene-forward with an earthy, relaxing profile",
+    YELLOW: "limonene-forward with bright, citrus-leaning aroma and an upbeat profile",
+    PURPLE: "caryophyllene-forward with spicy, peppery notes and a balanced profile",
+    GREEN: "pinene-forward with sharp, pine-like aroma and an alert profile",
+    ORANGE: "terpinolene-forward with complex, floral, and citrus notes",
+    RED: "balanced myrcene-limonene-caryophyllene with a versatile, hybrid profile"
+}
+
+# Per-category summary text around the terpene detail: (head, tail). Built
+# once so a summary only interpolates the strain name and top terpenes.
+def _summary_parts(category: str, description: str) -> Tuple[str, str]:
+    traditional = get_traditional_label(category).lower()
+    return (
+        f"'s composition puts it in the {category} category — expect {description}",
+        f". In traditional terms, this aligns with a {traditional} experience.",
+    )
+
+_SUMMARY_PARTS = {
+    category: _summary_parts(category, description)
+    for category, description in CATEGORY_DESCRIPTIONS.items()
+}
+
+# Greek letters and hyphens folded to snake_case ("β-myrcene" -> "beta_myrcene")
+_KEY_TRANSLATION = str.maketrans({"α": "alpha", "β": "beta", "-": "_"})
+
+# Alternate snake_case terpene spellings -> standard names
+_KEY_MAPPING = {
+    "beta_myrcene": "myrcene",
+    "d_limonene": "limonene",
+    "beta_caryophyllene": "caryophyllene",
+    "beta_ocimene": "ocimene",
 }
 
+# Standard names pass through normalization untouched
+_CANONICAL_KEYS = frozenset(TERPENE_FIELD_MAP.values())
+
+def _standardize_terpenes(items: Iterable[Tuple[str, float]]) -> Dict[str, float]:
+    """Map terpene keys to standard names, keeping positive values (not yet scaled)."""
+    standardized = {}
+    for key, value in items:
+        if key in _CANONICAL_KEYS:
+            std_key = key
+        else:
+            folded = key.lower().translate(_KEY_TRANSLATION)
+            std_key = _KEY_MAPPING.get(folded, folded)
+        if value is not None and value > 0:
+            standardized[std_key] = float(value)
+    return standardized
+
 def normalize_terpene_profile(terpenes: Dict[str, float]) -> Dict[str, float]:
     """
     Normalize terpene percentages to sum to 1.0 for classification.
     Handles various naming conventions.
     """
-    # Normalize keys to standard names
-    key_mapping = {
-        "beta_myrcene": "myrcene",
-        "β-myrcene": "myrcene",
-        "d_limonene": "limonene",
-        "d-limonene": "limonene",
-        "beta_caryophyllene": "caryophyllene",
-        "β-caryophyllene": "caryophyllene",
-        "alpha_pinene": "alpha_pinene",
-        "α-pinene": "alpha_pinene",
-        "beta_pinene": "beta_pinene",
-        "β-pinene": "beta_pinene",
-        "beta_ocimene": "ocimene",
-        "β-ocimene": "ocimene",
-    }
-
-    normalized = {}
-    for key, value in terpenes.items():
-        std_key = key_mapping.get(key.lower(), key.lower())
-        if value is not None and value > 0:
-            normalized[std_key] = float(value)
+    normalized = _standardize_terpenes(terpenes.items())
 
     # Calculate total for normalization
     total = sum(normalized.values())
@@ -83,84 +118,150 @@ def get_top_terpene(terps: Dict[str, float]) -> Tuple[str, float]:
     """Get the dominant terpene and its percentage."""
     if not terps:
         return "", 0.0
-    top = max(terps.items(), key=lambda x: x[1])
-    return top[0], top[1]
-
-def is_within_range(values: list, tolerance: float = 0.15) -> bool:
+    # Plain scan beats max(key=...) on these small dicts; first maximum wins, as with max()
+    top_name, top_value = "", float("-inf")
+    for name, value in terps.items():
+        if value > top_value:
+            top_name, top_value = name, value
+    return top_name, top_value
+
+def is_within_range(values: Sequence[float], tolerance: float = RED_BALANCE_TOLERANCE) -> bool:
     """Check if all values are within tolerance of each other."""
     if not values:
         return False
     avg = sum(values) / len(values)
-    return all(abs(v - avg) / avg <= tolerance for v in values)
+    # Only the extremes can be furthest from the mean, so checking min and
+    # max is the same test as checking every value
+    return (max(values) - avg) / avg <= tolerance and (avg - min(values)) / avg <= tolerance
+
+def _freeze(terpenes: Dict[str, float]) -> Tuple[Tuple[str, float], ...]:
+    """Hashable cache key for a terpene dict (insertion order kept, since ties depend on it)."""
+    return tuple(terpenes.items())
 
 def classify_terpene_profile(terpenes: Dict[str, float]) -> str:
     """
     Classify terpene profile into one of the 6 SDP categories.
 
+    Results are memoized on the profile contents, so repeat strains skip
+    normalization and the threshold checks.
+
     Args:
         terpenes: Dictionary of terpene names to percentages (0-100 or 0-1)
 
     Returns:
         Category string: BLUE, YELLOW, PURPLE, GREEN, ORANGE, or RED
     """
-    # Normalize the profile
-    terps = normalize_terpene_profile(terpenes)
+    if not terpenes:
+        return BLUE  # Default fallback, without building a cache key
+    return _classify_cached(_freeze(terpenes))
 
-    if not terps:
-        return "BLUE"  # Default fallback
+def classify_terpene_profiles(profiles: Iterable[Dict[str, float]]) -> List[str]:
+    """
+    Classify many terpene profiles (e.g. a dataset import) in one call.
+
+    Identical profiles are classified once per call. Results bypass the
+    per-request memo cache so a bulk import does not evict hot entries.
 
-    # Get individual terpene values
-    myrcene = terps.get("myrcene", 0)
-    limonene = terps.get("limonene", 0)
-    caryophyllene = terps.get("caryophyllene", 0)
-    terpinolene = terps.get("terpinolene", 0)
-    pinene_total = get_combined_pinene(terps)
-    humulene = terps.get("humulene", 0)
+    Args:
+        profiles: Terpene dicts, as accepted by classify_terpene_profile
 
+    Returns:
+        Category string for each profile, in input order
+    """
+    seen: Dict[Tuple[Tuple[str, float], ...], str] = {}
+    categories = []
+    for terpenes in profiles:
+        key = _freeze(terpenes)
+        category = seen.get(key)
+        if category is None:
+            category = seen[key] = _classify_profile(key)
+        categories.append(category)
+    return categories
+
+_PINENES = frozenset({"alpha_pinene", "beta_pinene"})
+
+# Category for a profile that matched no threshold rule, by its top terpene
+_TOP_TERPENE_CATEGORY = {
+    "myrcene": BLUE,
+    "limonene": YELLOW,
+    "caryophyllene": PURPLE,
+    "alpha_pinene": GREEN,
+    "beta_pinene": GREEN,
+    "terpinolene": ORANGE,
+}
+
+def _classify_profile(frozen_terpenes: Tuple[Tuple[str, float], ...]) -> str:
+    return classify_standardized_profile(_standardize_terpenes(frozen_terpenes))
+
+def classify_standardized_profile(terps: Dict[str, float]) -> str:
+    """
+    Classify a profile that already uses standard snake_case terpene names.
+
+    Fast path for callers that own canonical data: skips key standardization,
+    alias folding and the memo-key build. Values may be on any scale (they are
+    divided by their total) but must all be positive; otherwise use
+    classify_terpene_profile.
+
+    Args:
+        terps: Standard terpene name -> positive amount
+
+    Returns:
+        Category string: BLUE, YELLOW, PURPLE, GREEN, ORANGE, or RED
+    """
+    # Scale only the values the heuristic reads instead of building a fully
+    # normalized dict
+    if not terps:
+        return BLUE  # Default fallback
+
+    total = sum(terps.values())
+
+    # Get individual terpene values (as fractions of the total); the bound
+    # get is looked up once for all seven reads
+    get = terps.get
+    myrcene = get("myrcene", 0) / total
+    limonene = get("limonene", 0) / total
+    caryophyllene = get("caryophyllene", 0) / total
+    terpinolene = get("terpinolene", 0) / total
+    pinene_total = get("alpha_pinene", 0) / total + get("beta_pinene", 0) / total
+    humulene = get("humulene", 0) / total
+
+    # Scaling by a positive total keeps the ordering, so the top terpene can
+    # be picked from the raw values
     top_terp, top_value = get_top_terpene(terps)
+    top_value /= total
 
     # Apply SDP classification heuristic
 
     # ORANGE: Terpinolene-dominant
     if terpinolene >= ORANGE_THRESHOLD or (top_terp == "terpinolene" and top_value - terpinolene >= DOMINANCE_MARGIN):
-        return "ORANGE"
+        return ORANGE
 
     # GREEN: Pinene-dominant
-    if pinene_total >= GREEN_THRESHOLD or (top_terp in ["alpha_pinene", "beta_pinene"] and top_value >= DOMINANCE_MARGIN):
-        return "GREEN"
+    if pinene_total >= GREEN_THRESHOLD or (top_terp in _PINENES and top_value >= DOMINANCE_MARGIN):
+        return GREEN
 
     # BLUE: Myrcene-dominant
     if myrcene >= BLUE_THRESHOLD or (top_terp == "myrcene" and top_value - myrcene >= DOMINANCE_MARGIN):
-        return "BLUE"
+        return BLUE
 
     # RED: Balanced myrcene-limonene-caryophyllene (check before PURPLE — more specific)
     if (myrcene >= RED_BALANCED_MIN and limonene >= RED_BALANCED_MIN and caryophyllene >= RED_BALANCED_MIN and
-        is_within_range([myrcene, limonene, caryophyllene]) and
+        is_within_range((myrcene, limonene, caryophyllene), RED_BALANCE_TOLERANCE) and
         pinene_total <= RED_PINENE_MAX and humulene <= RED_HUMULENE_MAX):
-        return "RED"
+        return RED
 
     # PURPLE: Caryophyllene-dominant with low pinene
     if caryophyllene >= PURPLE_CARYOPHYLLENE_MIN and pinene_total <= PURPLE_PINENE_MAX:
-        return "PURPLE"
+        return PURPLE
 
     # YELLOW: Limonene-dominant
     if limonene >= YELLOW_THRESHOLD:
-        return "YELLOW"
-
-    # Fallback: pick nearest by top terpene
-    if top_terp == "myrcene":
-        return "BLUE"
-    elif top_terp == "limonene":
-        return "YELLOW"
-    elif top_terp == "caryophyllene":
-        return "PURPLE"
-    elif top_terp in ["alpha_pinene", "beta_pinene"]:
-        return "GREEN"
-    elif top_terp == "terpinolene":
-        return "ORANGE"
-
-    # Ultimate fallback
-    return "BLUE"
+        return YELLOW
+
+    # Fallback: pick nearest by top terpene (BLUE if it has no category)
+    return _TOP_TERPENE_CATEGORY.get(top_terp, BLUE)
+
+_classify_cached = lru_cache(maxsize=CLASSIFIER_CACHE_MAXSIZE)(_classify_profile)
 
 def generate_summary(strain_name: str, category: str, terpenes: Dict[str, float]) -> str:
     """
@@ -174,10 +275,17 @@ def generate_summary(strain_name: str, category: str, terpenes: Dict[str, float]
     Returns:
         One-line summary string
     """
-    description = CATEGORY_DESCRIPTIONS.get(category, "a unique terpene profile")
+    return _summary_cached(strain_name, category, _freeze(terpenes))
+
+@lru_cache(maxsize=CLASSIFIER_CACHE_MAXSIZE)
+def _summary_cached(strain_name: str, category: str, frozen_terpenes: Tuple[Tuple[str, float], ...]) -> str:
+    parts = _SUMMARY_PARTS.get(category)
+    if parts is None:
+        parts = _summary_parts(category, "a unique terpene profile")
+    head, tail = parts
 
-    # Get top 3 terpenes for detail
-    sorted_terps = sorted(terpenes.items(), key=lambda x: x[1], reverse=True)[:3]
+    # Get top 3 terpenes for detail (the frozen items are the dict's items)
+    sorted_terps = heapq.nlargest(3, frozen_terpenes, key=itemgetter(1))
     top_names = [name.replace("_", "-") for name, _ in sorted_terps]
 
     if len(top_names) >= 2:
@@ -185,8 +293,7 @@ def generate_summary(strain_name: str, category: str, terpenes: Dict[str, float]
     else:
         terp_detail = ""
 
-    traditional = get_traditional_label(category)
-    return f"{strain_name}'s composition puts it in the {category} category — expect {description}{terp_detail}. In traditional terms, this aligns with a {traditional.lower()} experience."
+    return f"{strain_name}{head}{terp_detail}{tail}"
 
 def generate_cannabinoid_insights(totals) -> List[str]:
     """
@@ -198,51 +305,59 @@ def generate_cannabinoid_insights(totals) -> List[str]:
     Returns:
         List of insight strings
     """
+    # Memoized on the exact values of the fields read below
+    return list(_insights_cached(
+        totals.thc, totals.thca, totals.cbd, totals.cbda,
+        totals.cbn, totals.cbg, totals.thcv, totals.cbdv,
+    ))
+
+# THC:CBD ratio bands: bisect_left gives the band for "ratio > bound" checks
+_RATIO_BINS = (0.5, 2.0, 5.0, 20.0)
+_RATIO_FORMATTERS = (
+    lambda r: f"CBD-rich (1:{1/r:.1f} ratio)",
+    lambda r: f"Balanced THC:CBD ({r:.1f}:1 ratio)",
+    lambda r: f"THC-leaning ({r:.1f}:1 ratio)",
+    lambda r: f"High THC ({r:.0f}:1 ratio)",
+    lambda r: f"THC-dominant ({r:.0f}:1 ratio)",
+)
+
+# Effective THC potency bands (same bisect_left convention)
+_POTENCY_BINS = (10, 15, 20, 25)
+_POTENCY_LABELS = (None, "Moderate potency", "Moderate-high potency", "High potency", "Very high potency")
+
+@lru_cache(maxsize=CLASSIFIER_CACHE_MAXSIZE)
+def _insights_cached(thc, thca, cbd, cbda, cbn, cbg, thcv, cbdv) -> Tuple[str, ...]:
     insights = []
 
     # Get effective THC and CBD (accounting for acid forms)
-    thc_total = (totals.thc or 0) + (totals.thca or 0) * 0.877  # THCA decarboxylation factor
-    cbd_total = (totals.cbd or 0) + (totals.cbda or 0) * 0.877  # CBDA decarboxylation factor
+    thc_total = (thc or 0) + (thca or 0) * 0.877  # THCA decarboxylation factor
+    cbd_total = (cbd or 0) + (cbda or 0) * 0.877  # CBDA decarboxylation factor
 
     # THC:CBD ratio insights
     if thc_total > 0 and cbd_total > 0:
         ratio = thc_total / cbd_total
-        if ratio > 20:
-            insights.append(f"THC-dominant ({ratio:.0f}:1 ratio)")
-        elif ratio > 5:
-            insights.append(f"High THC ({ratio:.0f}:1 ratio)")
-        elif ratio > 2:
-            insights.append(f"THC-leaning ({ratio:.1f}:1 ratio)")
-        elif ratio > 0.5:
-            insights.append(f"Balanced THC:CBD ({ratio:.1f}:1 ratio)")
-        else:
-            insights.append(f"CBD-rich (1:{1/ratio:.1f} ratio)")
+        insights.append(_RATIO_FORMATTERS[bisect_left(_RATIO_BINS, ratio)](ratio))
     elif thc_total > 0:
         insights.append("THC-dominant, minimal CBD")
     elif cbd_total > 0:
         insights.append("CBD-dominant, minimal THC")
 
     # Potency insights
-    if thc_total > 25:
-        insights.append("Very high potency")
-    elif thc_total > 20:
-        insights.append("High potency")
-    elif thc_total > 15:
-        insights.append("Moderate-high potency")
-    elif thc_total > 10:
-        insights.append("Moderate potency")
+    potency = _POTENCY_LABELS[bisect_left(_POTENCY_BINS, thc_total)]
+    if potency:
+        insights.append(potency)
 
     # Minor cannabinoid insights
-    if totals.cbn and totals.cbn > 0.005:  # >0.5%
+    if cbn and cbn > 0.005:  # >0.5%
         insights.append("Elevated CBN may promote sleepiness")
 
-    if totals.cbg and totals.cbg > 0.01:  # >1%
+    if cbg and cbg > 0.01:  # >1%
         insights.append("Notable CBG presence")
 
-    if totals.thcv and totals.thcv > 0.005:  # >0.5%
+    if thcv and thcv > 0.005:  # >0.5%
         insights.append("Contains THCV")
 
-    if totals.cbdv and totals.cbdv > 0.005:  # >0.5%
+    if cbdv and cbdv > 0.005:  # >0.5%
         insights.append("Contains CBDV")
 
-    return insights
+    return tuple(insights)
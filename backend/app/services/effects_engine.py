@@ -1,127 +1,203 @@
 # Effects engine: pure-function analysis of terpene/cannabinoid profiles
 # to generate detailed experience predictions.
 
-from typing import Dict, List, Optional
-from app.models.schemas import Totals
-
-# Terpene effect profiles — body_weight is 0 (cerebral) to 1 (body)
+import heapq
+import sys
+from bisect import bisect_left
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
+from app.core.constants import EFFECTS_CACHE_MAXSIZE
+from app.models.schemas import EffectsAnalysis, Totals
+
+# Terpene effect profiles — body_weight is 0 (cerebral) to 1 (body).
+# Effect/context lists are tuples: the table is static and only iterated.
 TERPENE_EFFECTS = {
     "myrcene": {
         "body_weight": 0.85,
-        "primary_effects": ["Relaxing", "Sedating", "Muscle relaxant", "Pain relief"],
-        "best_for": ["Nighttime", "Sleep", "Pain relief", "Relaxation"],
-        "avoid_for": ["Daytime productivity", "Social events"],
-        "negatives": ["Drowsiness", "Couch-lock at high levels"],
+        "primary_effects": ("Relaxing", "Sedating", "Muscle relaxant", "Pain relief"),
+        "best_for": ("Nighttime", "Sleep", "Pain relief", "Relaxation"),
+        "avoid_for": ("Daytime productivity", "Social events"),
+        "negatives": ("Drowsiness", "Couch-lock at high levels"),
         "onset_modifier": 0.0,  # baseline
         "duration_modifier": 0.1,  # slightly extends
     },
     "limonene": {
         "body_weight": 0.2,
-        "primary_effects": ["Uplifting", "Mood enhancement", "Stress relief", "Anti-anxiety"],
-        "best_for": ["Daytime", "Social events", "Creative work", "Mood boost"],
-        "avoid_for": ["Bedtime (may be too stimulating)"],
-        "negatives": ["Heartburn in sensitive individuals"],
+        "primary_effects": ("Uplifting", "Mood enhancement", "Stress relief", "Anti-anxiety"),
+        "best_for": ("Daytime", "Social events", "Creative work", "Mood boost"),
+        "avoid_for": ("Bedtime (may be too stimulating)",),
+        "negatives": ("Heartburn in sensitive individuals",),
         "onset_modifier": -0.05,  # slightly faster
         "duration_modifier": -0.05,
     },
     "caryophyllene": {
         "body_weight": 0.6,
-        "primary_effects": ["Anti-inflammatory", "Pain relief", "Stress reduction", "Calming"],
-        "best_for": ["Pain management", "Stress relief", "Evening wind-down"],
-        "avoid_for": [],
-        "negatives": ["Dry mouth"],
+        "primary_effects": ("Anti-inflammatory", "Pain relief", "Stress reduction", "Calming"),
+        "best_for": ("Pain management", "Stress relief", "Evening wind-down"),
+        "avoid_for": (),
+        "negatives": ("Dry mouth",),
         "onset_modifier": 0.0,
         "duration_modifier": 0.05,
     },
     "alpha_pinene": {
         "body_weight": 0.15,
-        "primary_effects": ["Alertness", "Focus", "Memory retention", "Bronchodilator"],
-        "best_for": ["Daytime", "Studying", "Hiking", "Creative focus"],
-        "avoid_for": ["Sleep"],
-        "negatives": ["May increase anxiety in sensitive users"],
+        "primary_effects": ("Alertness", "Focus", "Memory retention", "Bronchodilator"),
+        "best_for": ("Daytime", "Studying", "Hiking", "Creative focus"),
+        "avoid_for": ("Sleep",),
+        "negatives": ("May increase anxiety in sensitive users",),
         "onset_modifier": -0.05,
         "duration_modifier": -0.1,
     },
     "beta_pinene": {
         "body_weight": 0.15,
-        "primary_effects": ["Alertness", "Focus", "Memory retention"],
-        "best_for": ["Daytime", "Studying", "Focus work"],
-        "avoid_for": ["Sleep"],
-        "negatives": [],
+        "primary_effects": ("Alertness", "Focus", "Memory retention"),
+        "best_for": ("Daytime", "Studying", "Focus work"),
+        "avoid_for": ("Sleep",),
+        "negatives": (),
         "onset_modifier": -0.05,
         "duration_modifier": -0.1,
     },
     "terpinolene": {
         "body_weight": 0.3,
-        "primary_effects": ["Uplifting", "Creative", "Energizing", "Antioxidant"],
-        "best_for": ["Daytime", "Creative work", "Social events", "Exercise"],
-        "avoid_for": ["Anxiety-prone individuals", "Sleep"],
-        "negatives": ["Overstimulation if sensitive"],
+        "primary_effects": ("Uplifting", "Creative", "Energizing", "Antioxidant"),
+        "best_for": ("Daytime", "Creative work", "Social events", "Exercise"),
+        "avoid_for": ("Anxiety-prone individuals", "Sleep"),
+        "negatives": ("Overstimulation if sensitive",),
         "onset_modifier": -0.1,
         "duration_modifier": -0.15,
     },
     "humulene": {
         "body_weight": 0.5,
-        "primary_effects": ["Anti-inflammatory", "Appetite suppressant", "Pain relief"],
-        "best_for": ["Weight management", "Pain relief", "Evening"],
-        "avoid_for": [],
-        "negatives": [],
+        "primary_effects": ("Anti-inflammatory", "Appetite suppressant", "Pain relief"),
+        "best_for": ("Weight management", "Pain relief", "Evening"),
+        "avoid_for": (),
+        "negatives": (),
         "onset_modifier": 0.0,
         "duration_modifier": 0.0,
     },
     "linalool": {
         "body_weight": 0.75,
-        "primary_effects": ["Calming", "Sedative", "Anti-anxiety", "Anti-convulsant"],
-        "best_for": ["Nighttime", "Anxiety relief", "Sleep", "Relaxation"],
-        "avoid_for": ["Needing to stay alert"],
-        "negatives": ["Drowsiness"],
+        "primary_effects": ("Calming", "Sedative", "Anti-anxiety", "Anti-convulsant"),
+        "best_for": ("Nighttime", "Anxiety relief", "Sleep", "Relaxation"),
+        "avoid_for": ("Needing to stay alert",),
+        "negatives": ("Drowsiness",),
         "onset_modifier": 0.05,
         "duration_modifier": 0.1,
     },
     "ocimene": {
         "body_weight": 0.25,
-        "primary_effects": ["Uplifting", "Anti-inflammatory", "Antifungal"],
-        "best_for": ["Daytime", "Light activity"],
-        "avoid_for": [],
-        "negatives": [],
+        "primary_effects": ("Uplifting", "Anti-inflammatory", "Antifungal"),
+        "best_for": ("Daytime", "Light activity"),
+        "avoid_for": (),
+        "negatives": (),
         "onset_modifier": 0.0,
         "duration_modifier": -0.05,
     },
 }
 
-# Interaction rules: ratio-based terpene synergies
+# Column views of TERPENE_EFFECTS for the numeric passes: one index lookup
+# per terpene, then plain tuple reads instead of nested dict lookups
+_TERPENE_INDEX = {name: i for i, name in enumerate(TERPENE_EFFECTS)}
+_MIND_WEIGHT = tuple(1.0 - e["body_weight"] for e in TERPENE_EFFECTS.values())
+_ONSET_MODIFIER = tuple(e["onset_modifier"] for e in TERPENE_EFFECTS.values())
+_DURATION_MODIFIER = tuple(e["duration_modifier"] for e in TERPENE_EFFECTS.values())
+# Context strings are interned so the per-call contexts dict hashes and
+# compares them by identity
+_BEST_FOR = tuple(tuple(map(sys.intern, e["best_for"])) for e in TERPENE_EFFECTS.values())
+
+# THC-related warnings, one per threshold exceeded (see _THC_WARNING_BINS)
+_THC_WARNINGS = (
+    "High THC may cause anxiety or paranoia in sensitive users",
+    "Very high THC — start with a low dose",
+)
+
+# Every warning the engine can emit gets one bit, in first-seen order.
+# Per-call negatives are an int mask OR'd together and decoded once.
+_NEGATIVE_BITS = tuple(
+    (1 << bit, name)
+    for bit, name in enumerate(dict.fromkeys(
+        [name for e in TERPENE_EFFECTS.values() for name in e["negatives"]] + list(_THC_WARNINGS)
+    ))
+)
+_NEGATIVE_BIT = {name: bit for bit, name in _NEGATIVE_BITS}
+_NEGATIVE_MASK = tuple(
+    sum(_NEGATIVE_BIT[name] for name in set(e["negatives"])) for e in TERPENE_EFFECTS.values()
+)
+
+# Terpenes that push the daytime score up / down
+DAYTIME_TERPENES = ("terpinolene", "alpha_pinene", "beta_pinene", "limonene", "ocimene")
+NIGHTTIME_TERPENES = ("myrcene", "linalool")
+
+# Per-terpene daytime column: 1 = daytime, -1 = nighttime, 0 = neither
+_DAYPART = tuple(
+    1 if name in DAYTIME_TERPENES else -1 if name in NIGHTTIME_TERPENES else 0
+    for name in TERPENE_EFFECTS
+)
+
+# Fraction a terpene needs before its timeline/contexts and negatives count
+_CONTEXT_MIN_FRACTION = 0.05
+_NEGATIVE_MIN_FRACTION = 0.10
+
+# Interaction rules: ratio-based terpene synergies. A rule fires when every
+# (terpene(s), threshold) clause holds; a tuple of terpenes compares their
+# combined fraction.
 INTERACTION_RULES = [
     {
-        "condition": lambda t: t.get("limonene", 0) > 0.15 and t.get("myrcene", 0) > 0.20,
+        "all_above": (("limonene", 0.15), ("myrcene", 0.20)),
         "description": "Limonene tempers myrcene's heavy sedation, creating a more balanced relaxation with uplifted mood",
     },
     {
-        "condition": lambda t: t.get("myrcene", 0) > 0.25 and t.get("caryophyllene", 0) > 0.15,
+        "all_above": (("myrcene", 0.25), ("caryophyllene", 0.15)),
         "description": "Myrcene and caryophyllene synergize for deep body relaxation and potent pain relief",
     },
     {
-        "condition": lambda t: t.get("alpha_pinene", 0) + t.get("beta_pinene", 0) > 0.15 and t.get("myrcene", 0) > 0.20,
+        "all_above": ((("alpha_pinene", "beta_pinene"), 0.15), ("myrcene", 0.20)),
         "description": "Pinene may counteract some of myrcene's memory-clouding effects while preserving relaxation",
     },
     {
-        "condition": lambda t: t.get("linalool", 0) > 0.05 and t.get("myrcene", 0) > 0.20,
+        "all_above": (("linalool", 0.05), ("myrcene", 0.20)),
         "description": "Linalool and myrcene together amplify sedative effects — strong candidate for sleep aid",
     },
     {
-        "condition": lambda t: t.get("limonene", 0) > 0.15 and t.get("caryophyllene", 0) > 0.15,
+        "all_above": (("limonene", 0.15), ("caryophyllene", 0.15)),
         "description": "Limonene and caryophyllene together create a spicy-citrus stress relief combo",
     },
     {
-        "condition": lambda t: t.get("terpinolene", 0) > 0.15 and t.get("ocimene", 0) > 0.05,
+        "all_above": (("terpinolene", 0.15), ("ocimene", 0.05)),
         "description": "Terpinolene and ocimene create a distinctly uplifting, energetic experience characteristic of classic sativas",
     },
     {
-        "condition": lambda t: t.get("caryophyllene", 0) > 0.15 and t.get("humulene", 0) > 0.05,
+        "all_above": (("caryophyllene", 0.15), ("humulene", 0.05)),
         "description": "Caryophyllene and humulene (both found in hops) work together for enhanced anti-inflammatory effects",
     },
 ]
 
 
+def _compile_interaction_rules(rules: list) -> tuple:
+    """
+    Turn INTERACTION_RULES into (clauses, description) rows over fraction columns.
+
+    Each clause becomes (first_column, other_columns, threshold). Clauses are
+    ordered by descending threshold so the most selective check runs first
+    and most profiles are rejected after a single comparison.
+    """
+    compiled = []
+    for rule in rules:
+        clauses = []
+        for names, threshold in rule["all_above"]:
+            if isinstance(names, str):
+                names = (names,)
+            columns = tuple(_TERPENE_INDEX[name] for name in names)
+            clauses.append((columns[0], columns[1:], threshold))
+        clauses.sort(key=lambda clause: clause[2], reverse=True)
+        compiled.append((tuple(clauses), rule["description"]))
+    return tuple(compiled)
+
+
+_INTERACTION_TABLE = _compile_interaction_rules(INTERACTION_RULES)
+
+
 def generate_effects_profile(
     terpenes: Dict[str, float],
     totals: Optional[Totals] = None,
@@ -142,50 +218,113 @@ def generate_effects_profile(
     if not terpenes:
         return {}
 
-    totals = totals or Totals()
+    # Effective THC/CBD (acid forms decarboxylated) are the only cannabinoid
+    # inputs the engine uses
+    thc_total = cbd_total = 0
+    if totals is not None:
+        thc_total = (totals.thc or 0) + (totals.thca or 0) * 0.877
+        cbd_total = (totals.cbd or 0) + (totals.cbda or 0) * 0.877
+
+    cached = _effects_cached(tuple(terpenes.items()), thc_total, cbd_total, category)
+    if not cached:
+        return {}
+
+    # Fresh lists per call so callers can't mutate the cached result
+    result = dict(cached)
+    for field in _LIST_FIELDS:
+        result[field] = list(result[field])
+    return result
+
+
+def generate_effects_analysis(
+    terpenes: Dict[str, float],
+    totals: Optional[Totals] = None,
+    category: Optional[str] = None,
+) -> Optional[EffectsAnalysis]:
+    """
+    Effects profile as the API response model, or None if there is nothing to analyze.
+
+    Built with model_construct: the engine's output already matches the
+    schema (string lists, scores clamped to 0-1), so re-validating every
+    field on each request is wasted work.
+    """
+    effects_data = generate_effects_profile(terpenes, totals, category)
+    if not effects_data:
+        return None
+    return EffectsAnalysis.model_construct(**effects_data)
+
+
+# Result fields cached as tuples and handed out as lists
+_LIST_FIELDS = ("best_contexts", "potential_negatives", "terpene_interactions")
+
+
+@lru_cache(maxsize=EFFECTS_CACHE_MAXSIZE)
+def _effects_cached(
+    frozen_terpenes: Tuple[Tuple[str, float], ...],
+    thc_total: float,
+    cbd_total: float,
+    category: Optional[str],
+) -> dict:
+    # Keyed on the exact terpene items (order kept, since ties depend on it)
+    terpenes = dict(frozen_terpenes)
 
-    # Normalize terpenes to fractions if needed
+    # Terpenes are normalized to fractions inside the aggregate pass
     total_terp = sum(terpenes.values())
-    if total_terp > 0:
-        norm_terps = {k: v / total_terp for k, v in terpenes.items()}
-    else:
+    if not total_terp > 0:
         return {}
 
+    # One pass over the profile collects every per-terpene aggregate
+    (
+        fractions, active, mind_value, mind_weight, daytime_frac, nighttime_frac,
+        onset_mod, duration_mod, contexts, negative_mask,
+    ) = _aggregate_terpenes(terpenes, total_terp)
+
     # Calculate body/mind balance (0 = pure body, 1 = pure mind)
-    body_mind_balance = _calc_body_mind_balance(norm_terps)
+    body_mind_balance = _calc_body_mind_balance(mind_value, mind_weight)
 
     # Calculate daytime suitability (0 = nighttime, 1 = daytime)
-    daytime_score = _calc_daytime_score(norm_terps, body_mind_balance)
+    daytime_score = _calc_daytime_score(daytime_frac, nighttime_frac, body_mind_balance)
 
     # Determine onset, peak, and duration
-    onset, peak, duration = _calc_timeline(norm_terps, totals)
+    (
+        onset_min, onset_max, peak_min, peak_max, duration_min, duration_max,
+    ) = _calc_timeline(onset_mod, duration_mod, thc_total, cbd_total)
 
     # Intensity estimate based on THC + terpene content
-    intensity_estimate = _calc_intensity(totals)
+    intensity_estimate = _calc_intensity(thc_total, cbd_total)
 
     # Collect best contexts and potential negatives
-    best_contexts = _collect_best_contexts(norm_terps)
-    potential_negatives = _collect_negatives(norm_terps, totals)
+    best_contexts = _collect_best_contexts(contexts)
+    potential_negatives = _collect_negatives(negative_mask, thc_total)
 
     # Find terpene interactions
-    terpene_interactions = _find_interactions(norm_terps)
+    # Every rule pairs two distinct terpenes above the 0.05 context cutoff
+    # (the pinene pair needs one of them above 0.075), so skip the table
+    # when fewer than two are that prominent
+    terpene_interactions = _find_interactions(fractions) if active >= 2 else []
 
     # Generate overall character description
-    overall_character = _describe_character(norm_terps, category, body_mind_balance, daytime_score)
+    overall_character = _describe_character(terpenes, category, body_mind_balance, daytime_score)
 
     # Generate narrative experience summary
     experience_summary = _generate_experience_summary(
-        norm_terps, totals, category, body_mind_balance, daytime_score, intensity_estimate
+        terpenes, thc_total, cbd_total, category, body_mind_balance, daytime_score, intensity_estimate
     )
 
     return {
         "overall_character": overall_character,
-        "onset": onset,
-        "peak": peak,
-        "duration": duration,
-        "best_contexts": best_contexts,
-        "potential_negatives": potential_negatives,
-        "terpene_interactions": terpene_interactions,
+        "onset": format_timeline(onset_min, onset_max),
+        "peak": format_timeline(peak_min, peak_max),
+        "duration": format_timeline(duration_min, duration_max),
+        "onset_min": onset_min,
+        "onset_max": onset_max,
+        "peak_min": peak_min,
+        "peak_max": peak_max,
+        "duration_min": duration_min,
+        "duration_max": duration_max,
+        "best_contexts": tuple(best_contexts),
+        "potential_negatives": tuple(potential_negatives),
+        "terpene_interactions": tuple(terpene_interactions),
         "experience_summary": experience_summary,
         "intensity_estimate": intensity_estimate,
         "daytime_score": round(daytime_score, 2),
@@ -193,126 +332,145 @@ def generate_effects_profile(
     }
 
 
-def _calc_body_mind_balance(terps: Dict[str, float]) -> float:
-    # Weighted average of body_weight (inverted: 0=body, 1=mind)
-    total_weight = 0.0
-    total_value = 0.0
-    for name, fraction in terps.items():
-        effect = TERPENE_EFFECTS.get(name)
-        if effect and fraction > 0:
-            mind_weight = 1.0 - effect["body_weight"]
-            total_value += mind_weight * fraction
-            total_weight += fraction
-    if total_weight > 0:
-        return total_value / total_weight
-    return 0.5  # default balanced
+def _aggregate_terpenes(terps: Dict[str, float], total: float) -> tuple:
+    """
+    Walk the raw profile once, normalizing each value by ``total`` and
+    accumulating everything the effect helpers need.
+
+    Returns:
+        (fractions, active, mind_value, mind_weight, daytime_frac, nighttime_frac,
+         onset_mod, duration_mod, contexts, negative_mask) where fractions is the
+        per-column fraction list, active counts known terpenes above the
+        context cutoff, contexts maps context -> max fraction and
+        negative_mask is an OR of _NEGATIVE_BITS
+    """
+    index = _TERPENE_INDEX
+    fractions = [0.0] * len(index)
+    mind_value = mind_weight = 0.0
+    daytime_frac = nighttime_frac = 0.0
+    onset_mod = duration_mod = 0.0
+    active = 0
+    contexts = {}  # context -> max weight
+    negative_mask = 0
+
+    for name, value in terps.items():
+        i = index.get(name)
+        if i is None:
+            continue
+        fraction = value / total
+        fractions[i] = fraction
+
+        daypart = _DAYPART[i]
+        if daypart > 0:
+            daytime_frac += fraction
+        elif daypart < 0:
+            nighttime_frac += fraction
+
+        if fraction > 0:
+            # Weighted average of body_weight (inverted: 0=body, 1=mind)
+            mind_value += _MIND_WEIGHT[i] * fraction
+            mind_weight += fraction
+
+            if fraction > _CONTEXT_MIN_FRACTION:
+                active += 1
+                onset_mod += _ONSET_MODIFIER[i] * fraction * 10
+                duration_mod += _DURATION_MODIFIER[i] * fraction * 10
+                for ctx in _BEST_FOR[i]:
+                    if ctx not in contexts or fraction > contexts[ctx]:
+                        contexts[ctx] = fraction
+
+                if fraction > _NEGATIVE_MIN_FRACTION:
+                    negative_mask |= _NEGATIVE_MASK[i]
+
+    return (
+        fractions, active, mind_value, mind_weight, daytime_frac, nighttime_frac,
+        onset_mod, duration_mod, contexts, negative_mask,
+    )
 
 
-def _calc_daytime_score(terps: Dict[str, float], body_mind: float) -> float:
-    # Daytime terpenes boost score, nighttime terpenes lower it
-    daytime_terps = {"terpinolene", "alpha_pinene", "beta_pinene", "limonene", "ocimene"}
-    nighttime_terps = {"myrcene", "linalool"}
+def _calc_body_mind_balance(mind_value: float, mind_weight: float) -> float:
+    if mind_weight > 0:
+        return mind_value / mind_weight
+    return 0.5  # default balanced
 
-    daytime_frac = sum(terps.get(t, 0) for t in daytime_terps)
-    nighttime_frac = sum(terps.get(t, 0) for t in nighttime_terps)
 
-    # Base from body_mind, adjusted by terpene fractions
+def _calc_daytime_score(daytime_frac: float, nighttime_frac: float, body_mind: float) -> float:
+    # Base from body_mind, adjusted by daytime/nighttime terpene fractions
     score = body_mind * 0.6 + daytime_frac * 0.8 - nighttime_frac * 0.4
     return max(0.0, min(1.0, score))
 
 
-def _calc_timeline(terps: Dict[str, float], totals: Totals) -> tuple:
+# THC bands: bisect_left counts the bounds a value is strictly above, which
+# matches the "thc_total > bound" checks these tables replace
+_THC_DURATION_BINS = (20, 25)
+_THC_DURATION_BONUS = (0, 15, 30)  # extra minutes of duration per band
+_INTENSITY_BINS = (0, 10, 15, 22, 28)
+_INTENSITY_LABELS = ("Unknown", "Low-Moderate", "Moderate", "Moderate-High", "High", "Very High")
+_THC_WARNING_BINS = (25, 30)
+_THC_WARNING_MASKS = (
+    0,
+    _NEGATIVE_BIT[_THC_WARNINGS[0]],
+    _NEGATIVE_BIT[_THC_WARNINGS[0]] | _NEGATIVE_BIT[_THC_WARNINGS[1]],
+)
+
+
+def _calc_timeline(onset_mod: float, duration_mod: float, thc_total: float, cbd_total: float) -> Tuple[int, ...]:
+    """Return (onset_min, onset_max, peak_min, peak_max, duration_min, duration_max) in minutes."""
     # Base timeline in minutes
     base_onset = 10
     base_peak = 30
     base_duration = 120
 
-    onset_mod = 0.0
-    duration_mod = 0.0
-    for name, fraction in terps.items():
-        effect = TERPENE_EFFECTS.get(name)
-        if effect and fraction > 0.05:
-            onset_mod += effect["onset_modifier"] * fraction * 10
-            duration_mod += effect["duration_modifier"] * fraction * 10
-
     # THC potency extends duration
-    thc_total = (getattr(totals, 'thc', 0) or 0) + (getattr(totals, 'thca', 0) or 0) * 0.877
-    if thc_total > 25:
-        duration_mod += 30
-    elif thc_total > 20:
-        duration_mod += 15
+    duration_mod += _THC_DURATION_BONUS[bisect_left(_THC_DURATION_BINS, thc_total)]
 
     # CBD can moderate onset
-    cbd_total = (getattr(totals, 'cbd', 0) or 0) + (getattr(totals, 'cbda', 0) or 0) * 0.877
     if cbd_total > 5:
         onset_mod += 5  # slightly slower onset
 
-    onset = f"{max(5, int(base_onset + onset_mod))}-{max(10, int(base_onset + onset_mod + 10))} min"
-    peak = f"{max(15, int(base_peak + onset_mod))}-{max(30, int(base_peak + onset_mod + 20))} min"
-    duration = f"{max(60, int(base_duration + duration_mod))}-{max(90, int(base_duration + duration_mod + 60))} min"
+    return (
+        max(5, int(base_onset + onset_mod)), max(10, int(base_onset + onset_mod + 10)),
+        max(15, int(base_peak + onset_mod)), max(30, int(base_peak + onset_mod + 20)),
+        max(60, int(base_duration + duration_mod)), max(90, int(base_duration + duration_mod + 60)),
+    )
 
-    return onset, peak, duration
 
+def format_timeline(low: int, high: int) -> str:
+    """Render a minute range the way the UI shows it, e.g. "10-20 min"."""
+    return f"{low}-{high} min"
 
-def _calc_intensity(totals: Totals) -> str:
-    thc_total = (getattr(totals, 'thc', 0) or 0) + (getattr(totals, 'thca', 0) or 0) * 0.877
-    cbd_total = (getattr(totals, 'cbd', 0) or 0) + (getattr(totals, 'cbda', 0) or 0) * 0.877
 
+def _calc_intensity(thc_total: float, cbd_total: float) -> str:
     # CBD buffers intensity
     if cbd_total > 5 and thc_total > 0:
         thc_total *= 0.8  # reduce effective intensity
 
-    if thc_total > 28:
-        return "Very High"
-    elif thc_total > 22:
-        return "High"
-    elif thc_total > 15:
-        return "Moderate-High"
-    elif thc_total > 10:
-        return "Moderate"
-    elif thc_total > 0:
-        return "Low-Moderate"
-    else:
-        return "Unknown"
-
-
-def _collect_best_contexts(terps: Dict[str, float]) -> List[str]:
-    contexts = {}  # context -> max weight
-    for name, fraction in terps.items():
-        effect = TERPENE_EFFECTS.get(name)
-        if effect and fraction > 0.05:
-            for ctx in effect["best_for"]:
-                if ctx not in contexts or fraction > contexts[ctx]:
-                    contexts[ctx] = fraction
+    return _INTENSITY_LABELS[bisect_left(_INTENSITY_BINS, thc_total)]
 
-    # Sort by weight, return top contexts
-    sorted_contexts = sorted(contexts.items(), key=lambda x: x[1], reverse=True)
-    return [ctx for ctx, _ in sorted_contexts[:6]]
 
+def _collect_best_contexts(contexts: Dict[str, float]) -> List[str]:
+    # Top contexts by weight (nlargest keeps sorted()'s tie order)
+    return [ctx for ctx, _ in heapq.nlargest(6, contexts.items(), key=itemgetter(1))]
 
-def _collect_negatives(terps: Dict[str, float], totals: Totals) -> List[str]:
-    negatives = set()
-    for name, fraction in terps.items():
-        effect = TERPENE_EFFECTS.get(name)
-        if effect and fraction > 0.10:
-            for neg in effect["negatives"]:
-                negatives.add(neg)
 
-    # THC-related warnings
-    thc_total = (getattr(totals, 'thc', 0) or 0) + (getattr(totals, 'thca', 0) or 0) * 0.877
-    if thc_total > 25:
-        negatives.add("High THC may cause anxiety or paranoia in sensitive users")
-    if thc_total > 30:
-        negatives.add("Very high THC — start with a low dose")
+def _collect_negatives(negative_mask: int, thc_total: float) -> List[str]:
+    # THC-related warnings: one per threshold exceeded
+    negative_mask |= _THC_WARNING_MASKS[bisect_left(_THC_WARNING_BINS, thc_total)]
 
-    return list(negatives)
+    return [name for bit, name in _NEGATIVE_BITS if negative_mask & bit]
 
 
-def _find_interactions(terps: Dict[str, float]) -> List[str]:
+def _find_interactions(fractions: List[float]) -> List[str]:
     interactions = []
-    for rule in INTERACTION_RULES:
-        if rule["condition"](terps):
-            interactions.append(rule["description"])
+    for clauses, description in _INTERACTION_TABLE:
+        for first, others, threshold in clauses:
+            value = fractions[first]
+            for i in others:
+                value += fractions[i]
+            if not value > threshold:
+                break
+        else:
+            interactions.append(description)
     return interactions
 
 
@@ -344,23 +502,40 @@ def _describe_character(
     return f"A {character} experience, {timing}"
 
 
+def _top_two_terpenes(terps: Dict[str, float]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Names of the two largest terpenes in one pass, without sorting.
+
+    Ties go to the earlier entry, matching a stable descending sort.
+    """
+    first = second = None
+    first_value = second_value = 0.0
+    for name, value in terps.items():
+        if first is None or value > first_value:
+            second, second_value = first, first_value
+            first, first_value = name, value
+        elif second is None or value > second_value:
+            second, second_value = name, value
+    return first, second
+
+
 def _generate_experience_summary(
     terps: Dict[str, float],
-    totals: Totals,
+    thc_total: float,
+    cbd_total: float,
     category: Optional[str],
     body_mind: float,
     daytime: float,
     intensity: str,
 ) -> str:
     # Build a narrative summary
-    sorted_terps = sorted(terps.items(), key=lambda x: x[1], reverse=True)
-    top = sorted_terps[0] if sorted_terps else ("unknown", 0)
-    top_name = top[0].replace("_", " ")
+    top, second = _top_two_terpenes(terps)
+    top_name = (top or "unknown").replace("_", " ")
 
     parts = [f"Dominated by {top_name}"]
 
-    if len(sorted_terps) >= 2:
-        second_name = sorted_terps[1][0].replace("_", " ")
+    if second is not None:
+        second_name = second.replace("_", " ")
         parts[0] += f" with supporting {second_name}"
 
     if body_mind < 0.35:
@@ -372,9 +547,6 @@ def _generate_experience_summary(
     else:
         parts.append("expect a well-rounded experience balancing mind and body")
 
-    thc_total = (getattr(totals, 'thc', 0) or 0) + (getattr(totals, 'thca', 0) or 0) * 0.877
-    cbd_total = (getattr(totals, 'cbd', 0) or 0) + (getattr(totals, 'cbda', 0) or 0) * 0.877
-
     if cbd_total > 5 and thc_total > 0:
         parts.append("CBD presence may buffer intensity and reduce anxiety")
     elif thc_total > 25:
@@ -0,0 +1,40 @@
+"""
+Shared pooled HTTP client for upstream strain/COA APIs.
+
+One httpx.AsyncClient is reused across requests so repeat calls ride
+keep-alive (and HTTP/2) connections instead of paying a TCP + TLS
+handshake each time. Closed once from the FastAPI lifespan hook.
+"""
+
+from typing import Optional
+import httpx
+
+# Default per-request timeout with a tighter connect phase so a dead upstream
+# fails fast; callers override with timeout=... where needed
+DEFAULT_TIMEOUT = httpx.Timeout(15.0, connect=5.0)
+
+# Idle keep-alive connections are held for a minute so bursts of lookups
+# reuse warm TLS sessions
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60.0)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide AsyncClient, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=DEFAULT_TIMEOUT,
+            http2=True,
+            limits=HTTP_LIMITS,
+        )
+    return _client
+
+
+async def close_http_client():
+    """Close the shared client (called on application shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -3,14 +3,46 @@ Client for Kushy API - Free cannabis strain database
 https://kushyapp.github.io/kushy-api-docs/public/
 """
 
+import asyncio
 import logging
-import httpx
-from typing import Optional
+import orjson
+from typing import Dict, List, Optional, Tuple
+from app.core.constants import KUSHY_STRAINS_CACHE_TTL_SECONDS
 from app.models.schemas import StrainAPIData, Totals
+from app.services.http_client import get_http_client
 from app.utils.conversions import safe_terpene_value
+from app.utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# The bulk strain table changes rarely; keep one parsed copy per process
+_strain_list_cache = TTLCache(maxsize=1, ttl=KUSHY_STRAINS_CACHE_TTL_SECONDS)
+_strain_list_lock = asyncio.Lock()
+
+# (exact lowercase name -> strain, [(lowercase name, strain), ...] in API order)
+StrainIndex = Tuple[Dict[str, dict], List[Tuple[str, dict]]]
+
+
+def build_strain_index(strains: list) -> StrainIndex:
+    """
+    Index Kushy strain objects by lowercased name.
+
+    Names are lowercased once here so lookups don't redo it per strain.
+    The first strain wins when two share a name, matching the scan order.
+    """
+    by_name: Dict[str, dict] = {}
+    names: List[Tuple[str, dict]] = []
+    for strain_obj in strains:
+        if not isinstance(strain_obj, dict):
+            continue
+        name = strain_obj.get('name')
+        if not name or not isinstance(name, str):
+            continue
+        name_lower = name.lower()
+        by_name.setdefault(name_lower, strain_obj)
+        names.append((name_lower, strain_obj))
+    return by_name, names
+
 
 class KushyClient:
     """Client for interacting with Kushy API."""
@@ -18,6 +50,41 @@ class KushyClient:
     def __init__(self):
         self.base_url = "http://api.kushy.net/api/1.1/tables/strains/rows"
 
+    async def _get_strain_index(self) -> Optional[StrainIndex]:
+        """
+        Return the indexed Kushy strain table, fetching it at most once per TTL window.
+
+        Concurrent callers wait on a lock so a cold cache triggers a single
+        upstream request. Failed fetches are not cached.
+        """
+        index = _strain_list_cache.get(self.base_url)
+        if index is not None:
+            return index
+
+        async with _strain_list_lock:
+            index = _strain_list_cache.get(self.base_url)
+            if index is not None:
+                return index
+
+            logger.debug("Fetching strain list from Kushy API")
+            client = get_http_client()
+            response = await client.get(self.base_url)
+
+            if response.status_code != 200:
+                logger.debug("Kushy API returned status %s", response.status_code)
+                return None
+
+            strains = orjson.loads(response.content)
+
+            # Kushy returns an array of strain objects
+            if not isinstance(strains, list):
+                logger.debug("Kushy API did not return a list")
+                return None
+
+            index = build_strain_index(strains)
+            _strain_list_cache.set(self.base_url, index)
+            return index
+
     async def get_strain_data(self, strain_name: str) -> Optional[StrainAPIData]:
         """
         Get strain terpene and cannabinoid data from Kushy API.
@@ -29,89 +96,72 @@ class KushyClient:
             StrainAPIData with terpene profile, or None if not found
         """
         try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                logger.debug("Fetching strain data from Kushy API: %s", strain_name)
-
-                # Kushy API doesn't have direct strain lookup by name
-                # We need to fetch and filter (or use their search if available)
-                # For now, try to get all strains and filter
-                # Note: In production, you'd want to cache this or use better search
-                response = await client.get(self.base_url)
-
-                if response.status_code != 200:
-                    logger.debug("Kushy API returned status %s", response.status_code)
-                    return None
-
-                result = response.json()
-                logger.debug("Kushy API response type: %s", type(result))
-
-                # Kushy returns an array of strain objects
-                if not isinstance(result, list):
-                    logger.debug("Kushy API did not return a list")
-                    return None
+            logger.debug("Looking up strain in Kushy: %s", strain_name)
 
-                # Find strain by name (case-insensitive partial match)
-                strain_lower = strain_name.lower()
-                matching_strain = None
+            # Kushy has no name lookup; search the (cached) bulk strain table
+            index = await self._get_strain_index()
+            if index is None:
+                return None
+            by_name, names = index
 
-                for strain_obj in result:
-                    if not isinstance(strain_obj, dict):
-                        continue
+            # Find strain by name: exact (case-insensitive) first, then partial match
+            strain_lower = strain_name.lower()
+            matching_strain = by_name.get(strain_lower)
 
-                    strain_name_field = strain_obj.get('name', '')
-                    if strain_name_field and strain_lower in strain_name_field.lower():
+            if matching_strain is None:
+                for name_lower, strain_obj in names:
+                    if strain_lower in name_lower:
                         matching_strain = strain_obj
-                        logger.debug("Found matching strain in Kushy: %s", strain_name_field)
                         break
 
-                if not matching_strain:
-                    logger.debug("No strain found in Kushy for '%s'", strain_name)
-                    return None
-
-                # Extract terpene and cannabinoid data
-                terpenes = {}
-                totals = Totals()
-
-                # Kushy terpene field is a comma-separated string like "Limonene, Myrcene, Caryophyllene"
-                # This gives us presence but not percentages
-                terpene_str = matching_strain.get('terpenes', '')
-                if terpene_str:
-                    logger.debug("Kushy terpenes (qualitative): %s", terpene_str)
-                    # Note: Kushy doesn't provide terpene percentages, just presence
-                    # We can't return quantitative terpene data
-
-                # Kushy cannabinoid fields (these appear to be percentages or presence)
-                # Check if they provide actual values
-                thc_val = matching_strain.get('thc')
-                cbd_val = matching_strain.get('cbd')
-                cbg_val = matching_strain.get('cbg')
-                cbn_val = matching_strain.get('cbn')
-
-                logger.debug("Kushy cannabinoids - THC: %s, CBD: %s, CBG: %s, CBN: %s", thc_val, cbd_val, cbg_val, cbn_val)
-
-                # Parse cannabinoid values if present
-                for raw_val, field in [(thc_val, 'thc'), (cbd_val, 'cbd'),
-                                       (cbg_val, 'cbg'), (cbn_val, 'cbn')]:
-                    parsed = safe_terpene_value(raw_val)
-                    if parsed is not None:
-                        setattr(totals, field, parsed)
-
-                # Check if we got any useful data
-                has_data = bool(terpenes) or any([
-                    totals.thc, totals.cbd, totals.cbg, totals.cbn
-                ])
-
-                if not has_data:
-                    logger.debug("Kushy strain found but no quantitative terpene/cannabinoid data")
-                    return None
-
-                return StrainAPIData(
-                    strain_name=matching_strain.get('name', strain_name),
-                    terpenes=terpenes,
-                    totals=totals,
-                    source='kushy',
-                    match_score=0.9  # High confidence since we matched by name
-                )
+            if matching_strain is None:
+                logger.debug("No strain found in Kushy for '%s'", strain_name)
+                return None
+
+            logger.debug("Found matching strain in Kushy: %s", matching_strain['name'])
+
+            # Extract terpene and cannabinoid data
+            terpenes = {}
+            totals_values = {}
+
+            # Kushy terpene field is a comma-separated string like "Limonene, Myrcene, Caryophyllene"
+            # This gives us presence but not percentages
+            terpene_str = matching_strain.get('terpenes', '')
+            if terpene_str:
+                logger.debug("Kushy terpenes (qualitative): %s", terpene_str)
+                # Note: Kushy doesn't provide terpene percentages, just presence
+                # We can't return quantitative terpene data
+
+            # Kushy cannabinoid fields (these appear to be percentages or presence)
+            # Check if they provide actual values
+            thc_val = matching_strain.get('thc')
+            cbd_val = matching_strain.get('cbd')
+            cbg_val = matching_strain.get('cbg')
+            cbn_val = matching_strain.get('cbn')
+
+            logger.debug("Kushy cannabinoids - THC: %s, CBD: %s, CBG: %s, CBN: %s", thc_val, cbd_val, cbg_val, cbn_val)
+
+            # Parse cannabinoid values if present
+            for raw_val, field in [(thc_val, 'thc'), (cbd_val, 'cbd'),
+                                   (cbg_val, 'cbg'), (cbn_val, 'cbn')]:
+                parsed = safe_terpene_value(raw_val)
+                if parsed is not None:
+                    totals_values[field] = parsed
+
+            # Check if we got any useful data
+            has_data = bool(terpenes) or bool(totals_values)
+
+            if not has_data:
+                logger.debug("Kushy strain found but no quantitative terpene/cannabinoid data")
+                return None
+
+            return StrainAPIData(
+                strain_name=matching_strain.get('name', strain_name),
+                terpenes=terpenes,
+                totals=Totals(**totals_values),
+                source='kushy',
+                match_score=0.9  # High confidence since we matched by name
+            )
 
         except Exception as e:
             logger.error("Kushy API error", exc_info=True)
@@ -3,28 +3,149 @@ Client for Otreeba (Open Cannabis API)
 https://api.otreeba.com/swagger/
 """
 
+import asyncio
 import logging
-import urllib.parse
+import random
 import httpx
-from typing import Optional
+import orjson
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Optional, Tuple
 from app.core.config import settings
+from app.core.constants import (
+    STRAIN_API_CACHE_MAXSIZE, STRAIN_API_CACHE_TTL_SECONDS,
+    STRAIN_API_NEGATIVE_CACHE_MAXSIZE, STRAIN_API_NEGATIVE_CACHE_TTL_SECONDS,
+    UPSTREAM_BATCH_CONCURRENCY, OTREEBA_MAX_CONCURRENCY,
+    UPSTREAM_RETRY_ATTEMPTS, UPSTREAM_RETRY_BASE_SECONDS, UPSTREAM_RETRY_MAX_SECONDS,
+)
 from app.models.schemas import StrainAPIData, Totals
+from app.services.cannlytics_client import ANALYTE_TERPENE, ANALYTE_TOTALS
+from app.services.http_client import get_http_client
 from app.utils.conversions import safe_terpene_value
+from app.utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Terpene tokens searched for in lab-result analyte names, first match wins
+_TERPENE_TOKENS = (
+    'myrcene', 'limonene', 'caryophyllene', 'terpinolene',
+    'humulene', 'linalool', 'ocimene',
+)
+
+# Canonical analyte name -> (target, standard key); see resolve_otreeba_analyte
+_ANALYTE_TABLE = MappingProxyType({
+    **{token: (ANALYTE_TERPENE, token) for token in _TERPENE_TOKENS},
+    'alpha-pinene': (ANALYTE_TERPENE, 'alpha_pinene'),
+    'beta-pinene': (ANALYTE_TERPENE, 'beta_pinene'),
+    'thc': (ANALYTE_TOTALS, 'thc'),
+    'delta-9-thc': (ANALYTE_TOTALS, 'thc'),
+    'thca': (ANALYTE_TOTALS, 'thca'),
+    'cbd': (ANALYTE_TOTALS, 'cbd'),
+    'cbda': (ANALYTE_TOTALS, 'cbda'),
+    'cbn': (ANALYTE_TOTALS, 'cbn'),
+    'cbg': (ANALYTE_TOTALS, 'cbg'),
+})
+
+# Responses worth retrying: rate limited or a transient gateway/server error
+_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """
+    Seconds to wait before retry number `attempt` (1-based).
+
+    A numeric Retry-After header is honoured; otherwise exponential backoff
+    with jitter. Either way the wait is capped at UPSTREAM_RETRY_MAX_SECONDS.
+    """
+    if response is not None:
+        retry_after = response.headers.get("retry-after", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), UPSTREAM_RETRY_MAX_SECONDS)
+    backoff = min(UPSTREAM_RETRY_BASE_SECONDS * 2 ** (attempt - 1), UPSTREAM_RETRY_MAX_SECONDS)
+    return backoff * random.uniform(0.5, 1.0)
+
+
+@lru_cache(maxsize=1024)
+def resolve_otreeba_analyte(name: str) -> Optional[Tuple[str, str]]:
+    """
+    Map an Otreeba lab-result analyte name to (target, standard_key).
+
+    The name is canonicalized (lowercased, Greek letters spelled out, spaces
+    as hyphens) and looked up in _ANALYTE_TABLE; names like "beta-myrcene"
+    fall back to a substring scan. Memoized since analyte names repeat.
+    """
+    key = name.strip().lower().replace('α', 'alpha').replace('β', 'beta').replace(' ', '-')
+    hit = _ANALYTE_TABLE.get(key)
+    if hit is not None:
+        return hit
+
+    for token in _TERPENE_TOKENS:
+        if token in key:
+            return ANALYTE_TERPENE, token
+    if 'pinene' in key:
+        if 'alpha' in key:
+            return ANALYTE_TERPENE, 'alpha_pinene'
+        if 'beta' in key:
+            return ANALYTE_TERPENE, 'beta_pinene'
+        return None
+    if 'delta-9' in key:
+        return ANALYTE_TOTALS, 'thc'
+    return None
+
+
+def _parse_analytes(analytes: list, terpenes: dict, totals_values: dict) -> None:
+    """
+    Copy the mapped analytes of one lab result into terpenes / totals_values.
+
+    Names are resolved (memoized) before values are parsed, so values of
+    analytes we don't keep are never converted. Hot helpers are bound as
+    locals since labResults can hold many analytes.
+    """
+    resolve = resolve_otreeba_analyte
+    parse = safe_terpene_value
+    for analyte in analytes:
+        if not isinstance(analyte, dict):
+            continue
+        raw_value = analyte.get('value')
+        if raw_value is None:
+            continue
+        hit = resolve(analyte.get('name', ''))
+        if hit is None:
+            continue
+        val = parse(raw_value)
+        if val is None:
+            continue
+        target, std_key = hit
+        if target == ANALYTE_TERPENE:
+            terpenes[std_key] = val
+        else:
+            totals_values[std_key] = val
+
 
 class OtreebaClient:
     """Client for interacting with Otreeba API."""
 
     def __init__(self):
         self.base_url = "https://api.otreeba.com/v1"
+        self.strains_url = f"{self.base_url}/strains"
         self.api_key = settings.otreeba_api_key
+        self._cache = TTLCache(maxsize=STRAIN_API_CACHE_MAXSIZE, ttl=STRAIN_API_CACHE_TTL_SECONDS)
+        self._negative_cache = TTLCache(
+            maxsize=STRAIN_API_NEGATIVE_CACHE_MAXSIZE, ttl=STRAIN_API_NEGATIVE_CACHE_TTL_SECONDS
+        )
+        # Lookups currently in flight, keyed like the caches
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Caps concurrent requests to the Otreeba host
+        self._limiter = asyncio.Semaphore(OTREEBA_MAX_CONCURRENCY)
 
     async def get_strain_data(self, strain_name: str) -> Optional[StrainAPIData]:
         """
         Get strain terpene and cannabinoid data from Otreeba API.
 
+        Results are cached in-process by stripped, lowercased name; misses are
+        remembered for a shorter window. Concurrent lookups of the same name
+        share a single upstream request.
+
         Args:
             strain_name: Name of the strain to look up
 
@@ -35,136 +156,169 @@ class OtreebaClient:
             logger.debug("Otreeba API key not configured")
             return None
 
+        key = strain_name.strip().lower()
+        cached = self._cache.get(key)
+        if cached is not None:
+            logger.debug("Otreeba cache hit for '%s'", key)
+            return cached
+        if self._negative_cache.get(key):
+            logger.debug("Otreeba negative cache hit for '%s'", key)
+            return None
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load_strain_data(key, strain_name))
+            self._inflight[key] = task
+        # Shield so one caller being cancelled doesn't cancel the shared request
+        return await asyncio.shield(task)
+
+    async def _load_strain_data(self, key: str, strain_name: str) -> Optional[StrainAPIData]:
+        """Fetch a strain and record the outcome in the positive or negative cache."""
+        try:
+            strain_data = await self._fetch_strain_data(strain_name)
+            if strain_data is None:
+                self._negative_cache.set(key, True)
+            else:
+                self._cache.set(key, strain_data)
+            return strain_data
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _get_with_retry(self, client: httpx.AsyncClient, **kwargs) -> httpx.Response:
+        """
+        GET the strains endpoint, retrying transport errors, 429s and 5xx gateway errors.
+
+        Makes up to UPSTREAM_RETRY_ATTEMPTS attempts. The last response is
+        returned (or the last error raised) once they are used up.
+        """
+        for attempt in range(1, UPSTREAM_RETRY_ATTEMPTS + 1):
+            response = None
+            try:
+                async with self._limiter:
+                    response = await client.get(self.strains_url, **kwargs)
+            except httpx.TransportError as e:
+                if attempt == UPSTREAM_RETRY_ATTEMPTS:
+                    raise
+                logger.debug("Otreeba request failed (%s), retrying", e)
+            else:
+                if response.status_code not in _RETRY_STATUSES or attempt == UPSTREAM_RETRY_ATTEMPTS:
+                    return response
+                logger.debug("Otreeba returned %s, retrying", response.status_code)
+            # Sleep outside the limiter so waiting retries don't hold a slot
+            await asyncio.sleep(_retry_delay(attempt, response))
+
+    async def _fetch_strain_data(self, strain_name: str) -> Optional[StrainAPIData]:
+        """Look up a strain through the Otreeba API (uncached)."""
         try:
-            encoded_name = urllib.parse.quote_plus(strain_name)
-
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                # Otreeba requires API key in header
-                headers = {
-                    "X-API-Key": self.api_key,
-                    "Accept": "application/json"
-                }
-
-                # Try strains endpoint
-                url = f"{self.base_url}/strains"
-                logger.debug("Fetching strain data from Otreeba API: %s", strain_name)
-
-                # Search for strain by name
-                response = await client.get(
-                    url,
-                    headers=headers,
-                    params={"q": strain_name, "count": 10}
-                )
-
-                if response.status_code != 200:
-                    logger.debug("Otreeba API returned status %s", response.status_code)
-                    return None
-
-                result = response.json()
-                logger.debug("Otreeba API response type: %s", type(result))
-
-                # Otreeba typically returns {"data": [...]}
-                data = result.get('data', [])
-                if not data or not isinstance(data, list):
-                    logger.debug("No strains found in Otreeba response")
-                    return None
-
-                # Find best match (first result should be closest)
-                strain = data[0]
-                logger.debug("Found strain in Otreeba: %s", strain.get('name'))
-
-                # Extract terpene and cannabinoid data
-                terpenes = {}
-                totals = Totals()
-
-                # Otreeba structure varies - check for lab results
-                # Common fields: thc, cbd, labResults, etc.
-                for field in ['thc', 'cbd']:
-                    if field in strain:
-                        val = safe_terpene_value(strain[field])
-                        if val is not None:
-                            setattr(totals, field, val)
-
-                # Check for lab results which might have more detailed data
-                lab_results = strain.get('labResults', [])
-                if lab_results and isinstance(lab_results, list):
-                    for result in lab_results:
-                        if not isinstance(result, dict):
-                            continue
-
-                        # Look for terpene and cannabinoid data in lab results
-                        analytes = result.get('analytes', [])
-                        if analytes:
-                            for analyte in analytes:
-                                if not isinstance(analyte, dict):
-                                    continue
-
-                                name = analyte.get('name', '').lower()
-                                raw_value = analyte.get('value')
-                                if raw_value is None:
-                                    continue
-
-                                val = safe_terpene_value(raw_value)
-                                if val is None:
-                                    continue
-
-                                # Map terpenes
-                                terpene_map = {
-                                    'myrcene': 'myrcene', 'limonene': 'limonene',
-                                    'caryophyllene': 'caryophyllene', 'terpinolene': 'terpinolene',
-                                    'humulene': 'humulene', 'linalool': 'linalool', 'ocimene': 'ocimene',
-                                }
-                                cannabinoid_map = {
-                                    'thca': 'thca', 'cbd': 'cbd', 'cbda': 'cbda',
-                                    'cbn': 'cbn', 'cbg': 'cbg',
-                                }
-                                matched = False
-                                for keyword, std in terpene_map.items():
-                                    if keyword in name:
-                                        if keyword == 'pinene':
-                                            continue  # handled below
-                                        terpenes[std] = val
-                                        matched = True
-                                        break
-                                if not matched and 'pinene' in name:
-                                    if 'alpha' in name:
-                                        terpenes['alpha_pinene'] = val
-                                    elif 'beta' in name:
-                                        terpenes['beta_pinene'] = val
-                                    matched = True
-                                if not matched:
-                                    if name == 'thc' or 'delta-9' in name:
-                                        totals.thc = val
-                                    else:
-                                        for keyword, std in cannabinoid_map.items():
-                                            if name == keyword:
-                                                setattr(totals, std, val)
-                                                break
-
-                # Check if we got any useful data
-                has_data = bool(terpenes) or any([
-                    totals.thc, totals.cbd, totals.thca, totals.cbda,
-                    totals.cbn, totals.cbg
-                ])
-
-                if not has_data:
-                    logger.debug("Otreeba strain found but no terpene/cannabinoid data")
-                    return None
-
-                logger.info("Otreeba data - Terpenes: %s, Cannabinoids: %s", len(terpenes), bool(totals.thc or totals.cbd))
-
-                return StrainAPIData(
-                    strain_name=strain.get('name', strain_name),
-                    terpenes=terpenes,
-                    totals=totals,
-                    source='otreeba',
-                    match_score=0.85  # Good confidence from professional API
-                )
+            client = get_http_client()
+            # Otreeba requires API key in header
+            headers = {
+                "X-API-Key": self.api_key,
+                "Accept": "application/json"
+            }
+
+            logger.debug("Fetching strain data from Otreeba API: %s", strain_name)
+
+            # Search for strain by name; only the closest match is used, so
+            # ask for just one instead of parsing a page of lab results
+            response = await self._get_with_retry(
+                client,
+                headers=headers,
+                params={"q": strain_name, "count": 1},
+            )
+
+            if response.status_code != 200:
+                logger.debug("Otreeba API returned status %s", response.status_code)
+                return None
+
+            result = orjson.loads(response.content)
+            logger.debug("Otreeba API response type: %s", type(result))
+
+            # Otreeba typically returns {"data": [...]}
+            data = result.get('data', [])
+            if not data or not isinstance(data, list):
+                logger.debug("No strains found in Otreeba response")
+                return None
+
+            # Find best match (first result should be closest)
+            strain = data[0]
+            logger.debug("Found strain in Otreeba: %s", strain.get('name'))
+
+            # Extract terpene and cannabinoid data; Totals values are collected
+            # first so the model is built once
+            terpenes = {}
+            totals_values = {}
+
+            # Otreeba structure varies - check for lab results
+            # Common fields: thc, cbd, labResults, etc.
+            for field in ('thc', 'cbd'):
+                if field in strain:
+                    val = safe_terpene_value(strain[field])
+                    if val is not None:
+                        totals_values[field] = val
+
+            # Check for lab results which might have more detailed data
+            lab_results = strain.get('labResults', [])
+            if lab_results and isinstance(lab_results, list):
+                for result in lab_results:
+                    if not isinstance(result, dict):
+                        continue
+
+                    # Look for terpene and cannabinoid data in lab results
+                    analytes = result.get('analytes', [])
+                    if analytes:
+                        _parse_analytes(analytes, terpenes, totals_values)
+
+            # Check if we got any useful data (every mapped cannabinoid counts)
+            if not terpenes and not totals_values:
+                logger.debug("Otreeba strain found but no terpene/cannabinoid data")
+                return None
+
+            logger.info(
+                "Otreeba data - Terpenes: %s, Cannabinoids: %s",
+                len(terpenes), bool(totals_values.get('thc') or totals_values.get('cbd')),
+            )
+
+            return StrainAPIData(
+                strain_name=strain.get('name', strain_name),
+                terpenes=terpenes,
+                totals=Totals(**totals_values),
+                source='otreeba',
+                match_score=0.85  # Good confidence from professional API
+            )
 
         except Exception as e:
             logger.error("Otreeba API error", exc_info=True)
             return None
 
 
+    async def get_strain_data_batch(self, strain_names: List[str]) -> List[Optional[StrainAPIData]]:
+        """
+        Look up several strains concurrently over the shared HTTP client.
+
+        At most UPSTREAM_BATCH_CONCURRENCY requests are in flight at once so a
+        large batch doesn't exhaust the connection pool or trip rate limits.
+
+        Args:
+            strain_names: Names of the strains to look up
+
+        Returns:
+            StrainAPIData (or None if not found) for each name, in input order
+        """
+        semaphore = asyncio.Semaphore(UPSTREAM_BATCH_CONCURRENCY)
+
+        async def lookup(name: str) -> Optional[StrainAPIData]:
+            async with semaphore:
+                return await self.get_strain_data(name)
+
+        results = await asyncio.gather(
+            *(lookup(name) for name in strain_names), return_exceptions=True
+        )
+        for name, r in zip(strain_names, results):
+            if isinstance(r, BaseException):
+                logger.warning("Otreeba batch lookup failed for '%s': %s", name, r)
+        return [None if isinstance(r, BaseException) else r for r in results]
+
+
 # Global instance
 otreeba_client = OtreebaClient()
@@ -1,27 +1,117 @@
 # Database caching service for strain terpene profiles
 # Saves and retrieves strain data from PostgreSQL to avoid repeated API calls
 
-import json
 import logging
 import re
+import string
+import sys
+import orjson
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.db.models import Profile
 from app.db.base import SessionLocal
+from app.core.constants import (
+    PROFILE_CACHE_MAXSIZE, PROFILE_CACHE_TTL_SECONDS,
+    PROFILE_NEGATIVE_CACHE_MAXSIZE, PROFILE_NEGATIVE_CACHE_TTL_SECONDS,
+    SEARCH_FUZZY_CANDIDATES,
+)
 from app.models.schemas import Totals
-from app.utils.normalization import normalize_strain_name as _normalize
-from datetime import datetime
+from app.utils.normalization import normalize_strain_name as _normalize, intern_keys
+from app.utils.ttl_cache import TTLCache
+from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 
 # Path to OpenTHC alias map (built during dataset init)
 ALIAS_MAP_PATH = Path(__file__).parent.parent / "data" / "downloads" / "strain_alias_map.json"
 
+# Stub characters are [a-z0-9]; ASCII names take the translate fast path
+_STUB_KEEP = frozenset(string.ascii_lowercase + string.digits)
+_STUB_DELETE_ASCII = {c: None for c in range(128) if chr(c) not in _STUB_KEEP}
+_STUB_STRIP_RE = re.compile(r'[^a-z0-9]')
+
+
+@lru_cache(maxsize=4096)
+def _name_to_stub(name: str) -> str:
+    """Lowercase a strain name and keep only [a-z0-9]. Memoized since names repeat."""
+    stub = name.lower()
+    if stub.isascii():
+        return stub.translate(_STUB_DELETE_ASCII)
+    return _STUB_STRIP_RE.sub('', stub)
+
+
+# OpenTHC stub -> normalized canonical name, shared by every instance and
+# thread once loaded
+_alias_map: Optional[Dict[str, str]] = None
+
+
+def _load_alias_map() -> Dict[str, str]:
+    """
+    Parse the alias map file once per process (empty if missing or invalid).
+
+    Canonical names are normalized here so alias resolution is one dict probe.
+    """
+    global _alias_map
+    if _alias_map is None:
+        alias_map = {}
+        if ALIAS_MAP_PATH.exists():
+            try:
+                raw = orjson.loads(ALIAS_MAP_PATH.read_bytes())
+                alias_map = {
+                    stub: _normalize(canonical, title_case=False)
+                    for stub, canonical in raw.items()
+                    if isinstance(canonical, str)
+                }
+            except (orjson.JSONDecodeError, OSError, AttributeError):
+                pass
+        _alias_map = alias_map
+    return _alias_map
+
+
+def _utc_timestamp() -> str:
+    """Current UTC time as an ISO-8601 string with seconds precision."""
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+
+# Columns read for a cached profile; selecting them as a plain row skips ORM
+# object construction and identity-map bookkeeping
+_PROFILE_COLUMNS = (
+    Profile.strain_normalized,
+    Profile.terp_vector,
+    Profile.totals,
+    Profile.category,
+    Profile.provenance,
+    Profile.created_at,
+)
+
+
+def _profile_to_dict(profile) -> dict:
+    """Build the cached-profile dict for a _PROFILE_COLUMNS row."""
+    return {
+        'terpenes': intern_keys(profile.terp_vector),
+        # Reconstruct Totals object from JSON
+        'totals': Totals(**(profile.totals or {})),
+        'category': sys.intern(profile.category) if profile.category else None,
+        'source': 'database',
+        'provenance': profile.provenance,
+        'cached_at': profile.created_at.isoformat() if profile.created_at else None
+    }
+
 
 class ProfileCacheService:
     """Service for caching strain profiles in PostgreSQL."""
 
+    def __init__(self):
+        # Short-lived in-process cache of found profiles, keyed by normalized name
+        self._profile_cache = TTLCache(maxsize=PROFILE_CACHE_MAXSIZE, ttl=PROFILE_CACHE_TTL_SECONDS)
+        # Names with no profile, remembered briefly so repeat misses skip the DB
+        self._missing_cache = TTLCache(
+            maxsize=PROFILE_NEGATIVE_CACHE_MAXSIZE, ttl=PROFILE_NEGATIVE_CACHE_TTL_SECONDS
+        )
+
     def normalize_strain_name(self, name: str) -> str:
         """Normalize strain name for consistent lookups (lowercase)."""
         return _normalize(name, title_case=False)
@@ -38,35 +128,209 @@ class ProfileCacheService:
         """
         normalized_name = self.normalize_strain_name(strain_name)
 
+        cached = self._profile_cache.get(normalized_name)
+        if cached is not None:
+            return dict(cached)
+        if self._missing_cache.get(normalized_name):
+            return None
+
         db = SessionLocal()
         try:
             # Query for exact match on normalized name
-            profile = db.query(Profile).filter(
+            profile = db.query(*_PROFILE_COLUMNS).filter(
                 Profile.strain_normalized == normalized_name
             ).first()
 
             if profile:
                 logger.debug("Found cached profile for '%s' (normalized: '%s')", strain_name, normalized_name)
 
-                # Reconstruct Totals object from JSON
-                totals_dict = profile.totals or {}
-                totals = Totals(**totals_dict)
-
-                return {
-                    'terpenes': profile.terp_vector,
-                    'totals': totals,
-                    'category': profile.category,
-                    'source': 'database',
-                    'provenance': profile.provenance,
-                    'cached_at': profile.created_at.isoformat() if profile.created_at else None
-                }
+                result = _profile_to_dict(profile)
+                self._profile_cache.set(normalized_name, result)
+                return dict(result)
             else:
                 logger.debug("No cached profile found for '%s' (normalized: '%s')", strain_name, normalized_name)
+                self._missing_cache.set(normalized_name, True)
                 return None
 
         finally:
             db.close()
 
+    def _lookup_normalized(self, normalized_names) -> Dict[str, dict]:
+        """
+        Resolve normalized names through the in-process caches, then one IN query.
+
+        Rows found are added to the profile cache and the names still missing
+        to the miss cache.
+
+        Returns:
+            Dict of normalized name -> cached profile dict (shared; copy before handing out)
+        """
+        found: Dict[str, dict] = {}
+        to_query = set()
+        for normalized_name in normalized_names:
+            cached = self._profile_cache.get(normalized_name)
+            if cached is not None:
+                found[normalized_name] = cached
+            elif not self._missing_cache.get(normalized_name):
+                to_query.add(normalized_name)
+
+        if to_query:
+            db = SessionLocal()
+            try:
+                profiles = db.query(*_PROFILE_COLUMNS).filter(
+                    Profile.strain_normalized.in_(to_query)
+                ).all()
+            finally:
+                db.close()
+
+            for profile in profiles:
+                if profile.strain_normalized in found:
+                    continue
+                result = _profile_to_dict(profile)
+                self._profile_cache.set(profile.strain_normalized, result)
+                found[profile.strain_normalized] = result
+            for normalized_name in to_query.difference(found):
+                self._missing_cache.set(normalized_name, True)
+
+        return found
+
+    def get_cached_profiles(self, strain_names: List[str]) -> Dict[str, dict]:
+        """
+        Get cached profiles for several strains with at most one query.
+
+        Names already in the in-process caches are answered from memory; the
+        rest are fetched with a single IN (...) query.
+
+        Args:
+            strain_names: Raw strain names (normalized internally)
+
+        Returns:
+            Dict of raw strain name -> profile dict, for the names that were found
+        """
+        normalized = {name: self.normalize_strain_name(name) for name in strain_names}
+        found = self._lookup_normalized(set(normalized.values()))
+
+        return {
+            name: dict(found[normalized_name])
+            for name, normalized_name in normalized.items()
+            if normalized_name in found
+        }
+
+    def _apply_profile(
+        self,
+        db: Session,
+        existing: Optional[Profile],
+        normalized_name: str,
+        strain_name: str,
+        terpenes: dict,
+        totals: Totals,
+        category: str,
+        source: str,
+        extraction_id: Optional[int],
+    ) -> Optional[dict]:
+        """
+        Update an existing Profile or add a new one to the session (no commit).
+
+        Returns:
+            Cache entry for an updated profile, or None for a new one
+        """
+        if existing:
+            logger.debug("Profile for '%s' already exists, updating...", strain_name)
+
+            # Update existing profile
+            existing.terp_vector = terpenes
+            existing.totals = totals.model_dump()
+            existing.category = category
+            existing.provenance = {
+                'source': source,
+                'updated_at': _utc_timestamp(),
+                'original_name': strain_name
+            }
+            if extraction_id:
+                existing.extraction_id = extraction_id
+
+            # Snapshot the updated row before commit expires its attributes
+            return {
+                'terpenes': terpenes,
+                'totals': totals,
+                'category': category,
+                'source': 'database',
+                'provenance': existing.provenance,
+                'cached_at': existing.created_at.isoformat() if existing.created_at else None
+            }
+
+        logger.debug("Creating new profile for '%s' (normalized: '%s')", strain_name, normalized_name)
+
+        # Create new profile
+        new_profile = Profile(
+            strain_normalized=normalized_name,
+            terp_vector=terpenes,
+            totals=totals.model_dump(),
+            category=category,
+            provenance={
+                'source': source,
+                'created_at': _utc_timestamp(),
+                'original_name': strain_name
+            },
+            extraction_id=extraction_id
+        )
+        db.add(new_profile)
+        return None
+
+    def save_profiles_bulk(self, profiles: List[dict]) -> bool:
+        """
+        Save several strain profiles with one lookup query and one commit.
+
+        Args:
+            profiles: Dicts with save_profile's keyword arguments
+                      (strain_name, terpenes, totals, category, source,
+                      optional extraction_id)
+
+        Returns:
+            True if all were saved, False otherwise (nothing is saved)
+        """
+        if not profiles:
+            return True
+
+        # The last entry for a strain wins, as with sequential save_profile calls
+        latest = {self.normalize_strain_name(p['strain_name']): p for p in profiles}
+
+        db = SessionLocal()
+        try:
+            existing_rows = db.query(Profile).filter(
+                Profile.strain_normalized.in_(list(latest))
+            ).all()
+            by_name: Dict[str, Profile] = {}
+            for row in existing_rows:
+                by_name.setdefault(row.strain_normalized, row)
+
+            cache_entries = {
+                normalized_name: self._apply_profile(
+                    db, by_name.get(normalized_name), normalized_name, p['strain_name'],
+                    p['terpenes'], p['totals'], p['category'], p['source'],
+                    p.get('extraction_id'),
+                )
+                for normalized_name, p in latest.items()
+            }
+
+            db.commit()
+
+            for normalized_name, cache_entry in cache_entries.items():
+                self._missing_cache.pop(normalized_name)
+                if cache_entry:
+                    self._profile_cache.set(normalized_name, cache_entry)
+                else:
+                    self._profile_cache.pop(normalized_name)
+            logger.debug("Saved %d profiles in bulk", len(profiles))
+            return True
+
+        except Exception as e:
+            logger.error("Failed to bulk save %d profiles: %s", len(profiles), e)
+            db.rollback()
+            return False
+        finally:
+            db.close()
+
     def save_profile(
         self,
         strain_name: str,
@@ -99,40 +363,19 @@ class ProfileCacheService:
                 Profile.strain_normalized == normalized_name
             ).first()
 
-            if existing:
-                logger.debug("Profile for '%s' already exists, updating...", strain_name)
-
-                # Update existing profile
-                existing.terp_vector = terpenes
-                existing.totals = totals.model_dump()
-                existing.category = category
-                existing.provenance = {
-                    'source': source,
-                    'updated_at': datetime.utcnow().isoformat(),
-                    'original_name': strain_name
-                }
-                if extraction_id:
-                    existing.extraction_id = extraction_id
-
-            else:
-                logger.debug("Creating new profile for '%s' (normalized: '%s')", strain_name, normalized_name)
-
-                # Create new profile
-                new_profile = Profile(
-                    strain_normalized=normalized_name,
-                    terp_vector=terpenes,
-                    totals=totals.model_dump(),
-                    category=category,
-                    provenance={
-                        'source': source,
-                        'created_at': datetime.utcnow().isoformat(),
-                        'original_name': strain_name
-                    },
-                    extraction_id=extraction_id
-                )
-                db.add(new_profile)
+            cache_entry = self._apply_profile(
+                db, existing, normalized_name, strain_name,
+                terpenes, totals, category, source, extraction_id,
+            )
 
             db.commit()
+
+            # Write through to the in-process cache so the next lookup skips the DB
+            self._missing_cache.pop(normalized_name)
+            if cache_entry:
+                self._profile_cache.set(normalized_name, cache_entry)
+            else:
+                self._profile_cache.pop(normalized_name)
             logger.debug("Successfully saved profile for '%s'", strain_name)
             return True
 
@@ -143,23 +386,18 @@ class ProfileCacheService:
         finally:
             db.close()
 
-    def _load_alias_map(self) -> dict:
-        """Load OpenTHC stub -> canonical name alias map if available."""
-        if not hasattr(self, '_alias_map'):
-            self._alias_map = {}
-            if ALIAS_MAP_PATH.exists():
-                try:
-                    with open(ALIAS_MAP_PATH, 'r', encoding='utf-8') as f:
-                        self._alias_map = json.load(f)
-                except (json.JSONDecodeError, IOError):
-                    pass
-        return self._alias_map
-
-    def _name_to_stub(self, name: str) -> str:
+    def _load_alias_map(self) -> Dict[str, str]:
+        """Load OpenTHC stub -> normalized canonical name alias map if available."""
+        return _load_alias_map()
+
+    def warm(self) -> None:
+        """Load the alias map up front so the first alias lookup doesn't pay for it."""
+        _load_alias_map()
+
+    @staticmethod
+    def _name_to_stub(name: str) -> str:
         """Convert a strain name to an OpenTHC-style stub for alias lookup."""
-        stub = name.lower().strip()
-        stub = re.sub(r'[^a-z0-9]', '', stub)
-        return stub
+        return _name_to_stub(name)
 
     def resolve_strain_aliases(self, strain_name: str) -> list[str]:
         """
@@ -170,51 +408,29 @@ class ProfileCacheService:
         if not alias_map:
             return []
 
-        stub = self._name_to_stub(strain_name)
-        alternatives = []
-
         # Check if our stub matches a known strain
-        if stub in alias_map:
-            canonical = alias_map[stub]
-            alt_normalized = self.normalize_strain_name(canonical)
-            if alt_normalized != self.normalize_strain_name(strain_name):
-                alternatives.append(alt_normalized)
-
-        return alternatives
+        alt_normalized = alias_map.get(self._name_to_stub(strain_name))
+        if alt_normalized and alt_normalized != self.normalize_strain_name(strain_name):
+            return [alt_normalized]
+        return []
 
     def get_cached_profile_with_aliases(self, strain_name: str) -> Optional[dict]:
         """
         Get cached profile, falling back to alias lookup if direct match fails.
-        """
-        # Try direct lookup first
-        result = self.get_cached_profile(strain_name)
-        if result:
-            return result
-
-        # Try alias-based lookups
-        for alt_name in self.resolve_strain_aliases(strain_name):
-            db = SessionLocal()
-            try:
-                profile = db.query(Profile).filter(
-                    Profile.strain_normalized == alt_name
-                ).first()
-
-                if profile:
-                    logger.debug("Found profile via alias for '%s' -> '%s'", strain_name, alt_name)
-                    totals_dict = profile.totals or {}
-                    totals = Totals(**totals_dict)
-
-                    return {
-                        'terpenes': profile.terp_vector,
-                        'totals': totals,
-                        'category': profile.category,
-                        'source': 'database',
-                        'provenance': profile.provenance,
-                        'cached_at': profile.created_at.isoformat() if profile.created_at else None
-                    }
-            finally:
-                db.close()
 
+        Names not already cached in-process are looked up with one query.
+        """
+        # Direct name and aliases are fetched together; the direct match wins
+        candidates = [self.normalize_strain_name(strain_name)]
+        candidates.extend(self.resolve_strain_aliases(strain_name))
+        found = self._lookup_normalized(candidates)
+
+        for i, normalized_name in enumerate(candidates):
+            result = found.get(normalized_name)
+            if result is not None:
+                if i:
+                    logger.debug("Found profile via alias for '%s' -> '%s'", strain_name, normalized_name)
+                return dict(result)
         return None
 
     def get_full_cached_result(self, strain_name: str) -> Optional[dict]:
@@ -230,7 +446,7 @@ class ProfileCacheService:
         return {
             'strain_name': strain_name,
             'terpenes': cached.get('terpenes', {}),
-            'totals': cached.get('totals', Totals()),
+            'totals': cached.get('totals') or Totals(),
             'category': cached.get('category'),
             'source': 'database',
             'cached_at': cached.get('cached_at'),
@@ -313,9 +529,15 @@ class ProfileCacheService:
             if len(results) < limit:
                 from rapidfuzz import process, fuzz
 
-                # Get candidates not already matched
-                all_names = db.query(Profile.strain_normalized, Profile.category).all()
-                candidates = [(p.strain_normalized, p.category) for p in all_names if p.strain_normalized not in seen_names]
+                # Shortlist candidates with the pg_trgm index (similarity
+                # above pg_trgm's threshold) instead of shipping every row,
+                # then rescore the shortlist as before
+                shortlist = db.query(Profile.strain_normalized, Profile.category).filter(
+                    Profile.strain_normalized.op('%')(normalized_query)
+                ).order_by(
+                    func.similarity(Profile.strain_normalized, normalized_query).desc()
+                ).limit(SEARCH_FUZZY_CANDIDATES).all()
+                candidates = [(p.strain_normalized, p.category) for p in shortlist if p.strain_normalized not in seen_names]
 
                 if candidates:
                     candidate_names = [c[0] for c in candidates]
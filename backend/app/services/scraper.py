@@ -6,6 +6,7 @@ Extracts terpene data and COA links from cannabis product pages.
 import re
 import hashlib
 import json
+import orjson
 from typing import Optional, List, Dict
 from urllib.parse import urljoin
 from playwright.async_api import async_playwright, Page
@@ -130,9 +131,11 @@ async def scrape_url(url: str) -> ScrapedData:
                 # Look for product data in GraphQL or API endpoints
                 if any(keyword in url.lower() for keyword in ['graphql', 'api', 'product', 'menu']):
                     try:
-                        data = await response.json()
+                        # Parse the raw body directly; skips Playwright's text decode + stdlib json
+                        data = orjson.loads(await response.body())
                         logger.debug("Intercepted Dutchie API call: %s", url)
-                        logger.debug("  Response keys: %s", list(data.keys()) if isinstance(data, dict) else "not a dict")
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("  Response keys: %s", list(data.keys()) if isinstance(data, dict) else "not a dict")
                         intercepted_data['responses'].append({
                             'url': url,
                             'data': data
@@ -227,14 +230,16 @@ async def scrape_url(url: str) -> ScrapedData:
                 logger.debug("No Dutchie iframe found, checking for embed URL in source...")
                 html_content_temp = await page.content()
 
-                # Debug: Check if 'dutchie' appears anywhere in the page
-                dutchie_count = html_content_temp.lower().count('dutchie')
-                logger.debug("Found 'dutchie' %s times in page HTML", dutchie_count)
+                # Debug: Check if 'dutchie' appears anywhere in the page. These
+                # scan the whole HTML, so skip them unless DEBUG is on
+                if logger.isEnabledFor(logging.DEBUG):
+                    dutchie_count = html_content_temp.lower().count('dutchie')
+                    logger.debug("Found 'dutchie' %s times in page HTML", dutchie_count)
 
-                # Try to find any Dutchie-related content
-                dutchie_matches = re.findall(r'[^\s]*dutchie[^\s]*', html_content_temp, re.I)
-                if dutchie_matches:
-                    logger.debug("Dutchie-related strings found: %s", dutchie_matches[:5])
+                    # Try to find any Dutchie-related content
+                    dutchie_matches = re.findall(r'[^\s]*dutchie[^\s]*', html_content_temp, re.I)
+                    if dutchie_matches:
+                        logger.debug("Dutchie-related strings found: %s", dutchie_matches[:5])
 
                 dutchie_embed_match = re.search(
                     r'https://dutchie\.com/embedded-menu/[^\s\'"]+',
@@ -278,7 +283,9 @@ def extract_terpenes_from_api(data: dict) -> Dict[str, float]:
     Extract terpene data from API response (Dutchie GraphQL/REST).
     Recursively searches through nested data structures.
     """
-    logger.debug("API data to extract terpenes from: %s", json.dumps(data, default=str)[:1000])
+    # Serializing the whole payload is expensive; only do it when DEBUG is on
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("API data to extract terpenes from: %s", json.dumps(data, default=str)[:1000])
     terpenes = {}
 
     def search_for_terpenes(obj, depth=0):
@@ -437,7 +444,7 @@ async def extract_strain_name(page: Page, html: str) -> Optional[str]:
     json_ld = soup.find('script', type='application/ld+json')
     if json_ld:
         try:
-            data = json.loads(json_ld.string)
+            data = orjson.loads(json_ld.string)
             if isinstance(data, dict) and 'name' in data:
                 return data['name']
         except Exception:
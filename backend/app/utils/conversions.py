@@ -2,8 +2,13 @@
 # Centralizes the "parse float, convert percentage to fraction" pattern
 # that was previously duplicated across multiple API clients and parsers.
 
+import re
 from typing import Optional
 
+# Plain decimal / scientific notation accepted by float(); rejects sentinels
+# like 'nan', 'nd', '<loq' without raising
+_NUMERIC_RE = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
 
 def safe_float(value) -> Optional[float]:
     """
@@ -14,16 +19,17 @@ def safe_float(value) -> Optional[float]:
     """
     if value is None:
         return None
-    try:
-        s = str(value).strip()
-        if not s or s.lower() in ('', 'nan', 'none', 'null', 'nd', 'n/a', '<loq'):
-            return None
-        result = float(s)
-        if result > 0:
-            return result
-        return None
-    except (ValueError, TypeError):
+    # Numeric API values skip the str()/sentinel round trip (bool is excluded,
+    # matching the string path which rejects 'True'/'False')
+    if type(value) is float or type(value) is int:
+        return float(value) if value > 0 else None
+    # Validate with a pattern instead of float()/except: sentinels and junk
+    # ('', 'nd', '<loq', 'n/a', ...) are common and exception unwinding is slow
+    s = str(value).strip()
+    if not _NUMERIC_RE.fullmatch(s):
         return None
+    result = float(s)
+    return result if result > 0 else None
 
 
 def safe_terpene_value(value) -> Optional[float]:
@@ -1,16 +1,39 @@
 # Fuzzy strain name matching utilities.
 
-from rapidfuzz import fuzz, process
+from typing import Iterable, Sequence
+from rapidfuzz import fuzz, process, utils
 
+# Bound once at import to skip module attribute lookups per call
+_extract_one = process.extractOne
+_ratio = fuzz.ratio
+_default_process = utils.default_process
 
-def fuzzy_match_strain(query: str, candidates: list[str], threshold: float = 0.8) -> tuple[str, float]:
+
+def preprocess_candidates(names: Iterable[str]) -> tuple[str, ...]:
+    """
+    Normalize candidate names once (lowercase, strip non-alphanumerics) for reuse
+    across many fuzzy_match_strain(..., preprocessed=True) calls.
+    """
+    return tuple(_default_process(name) for name in names)
+
+
+def fuzzy_match_strain(
+    query: str,
+    candidates: Sequence[str],
+    threshold: float = 0.8,
+    preprocessed: bool = False,
+) -> tuple[str, float]:
     """
     Fuzzy match a strain name against a list of candidates.
 
+    Matching is case- and punctuation-insensitive (RapidFuzz default_process).
+
     Args:
         query: The strain name to match
         candidates: List of known strain names
         threshold: Minimum match score (0-1)
+        preprocessed: True if candidates came from preprocess_candidates(); only the
+                      query is normalized and the per-candidate processor is skipped
 
     Returns:
         Tuple of (best_match, score) or (query, 0.0) if no good match
@@ -18,14 +41,15 @@ def fuzzy_match_strain(query: str, candidates: list[str], threshold: float = 0.8
     if not candidates:
         return query, 0.0
 
-    # Use RapidFuzz to find best match
-    result = process.extractOne(
-        query,
-        candidates,
-        scorer=fuzz.ratio
-    )
+    # score_cutoff lets RapidFuzz prune candidates that cannot reach the threshold
+    # (RapidFuzz scores are 0-100)
+    if preprocessed:
+        result = _extract_one(_default_process(query), candidates, scorer=_ratio,
+                              processor=None, score_cutoff=threshold * 100)
+    else:
+        result = _extract_one(query, candidates, scorer=_ratio,
+                              processor=_default_process, score_cutoff=threshold * 100)
 
-    if result and result[1] >= threshold * 100:  # RapidFuzz returns 0-100
+    if result:
         return result[0], result[1] / 100
-    else:
-        return query, 0.0
+    return query, 0.0
@@ -4,29 +4,50 @@
 from typing import Dict, List
 from app.models.schemas import Totals
 
+# Source names in merge priority order (highest first)
+SOURCE_PRIORITY = ('coa', 'page', 'database', 'api')
+
+# Bit flags for the fixed source domain; merge helpers return an OR of these
+SOURCE_COA = 1
+SOURCE_PAGE = 2
+SOURCE_DATABASE = 4
+SOURCE_API = 8
+
+SOURCE_BITS = (
+    (SOURCE_COA, 'coa'),
+    (SOURCE_PAGE, 'page'),
+    (SOURCE_DATABASE, 'database'),
+    (SOURCE_API, 'api'),
+)
+
+
+def sources_from_mask(mask: int) -> List[str]:
+    """Expand a source bitmask into source names in priority order."""
+    return [name for bit, name in SOURCE_BITS if mask & bit]
+
 
 def merge_terpene_data(
     coa_terpenes: Dict[str, float],
     page_terpenes: Dict[str, float],
     db_terpenes: Dict[str, float],
     api_terpenes: Dict[str, float],
-) -> tuple[Dict[str, float], List[str]]:
+) -> tuple[Dict[str, float], int]:
     """
     Merge terpene data from multiple sources with priority: COA > Page > Database > API.
 
     For each terpene compound, uses the highest priority source that has it.
 
     Returns:
-        Tuple of (merged_terpenes, sources_used)
+        Tuple of (merged_terpenes, sources_mask) where sources_mask is an OR of SOURCE_* bits
     """
     merged = {}
-    sources_used = set()
+    sources_used = 0
 
     sources = [
-        ('coa', coa_terpenes),
-        ('page', page_terpenes),
-        ('database', db_terpenes),
-        ('api', api_terpenes),
+        (SOURCE_COA, coa_terpenes),
+        (SOURCE_PAGE, page_terpenes),
+        (SOURCE_DATABASE, db_terpenes),
+        (SOURCE_API, api_terpenes),
     ]
 
     # Collect all unique terpene keys
@@ -37,13 +58,13 @@ def merge_terpene_data(
 
     # For each terpene, use highest priority source
     for key in all_keys:
-        for source_name, terp_data in sources:
+        for source_bit, terp_data in sources:
             if terp_data and key in terp_data and terp_data[key] is not None and terp_data[key] > 0:
                 merged[key] = terp_data[key]
-                sources_used.add(source_name)
+                sources_used |= source_bit
                 break
 
-    return merged, list(sources_used)
+    return merged, sources_used
 
 
 def merge_cannabinoid_data(
@@ -51,23 +72,23 @@ def merge_cannabinoid_data(
     page_totals: Totals,
     db_totals: Totals,
     api_totals: Totals,
-) -> tuple[Totals, List[str]]:
+) -> tuple[Totals, int]:
     """
     Merge cannabinoid data from multiple sources with priority: COA > Page > Database > API.
 
     For each cannabinoid field, uses the highest priority source that has it.
 
     Returns:
-        Tuple of (merged_totals, sources_used)
+        Tuple of (merged_totals, sources_mask) where sources_mask is an OR of SOURCE_* bits
     """
-    merged = Totals()
-    sources_used = set()
+    merged_values = {}
+    sources_used = 0
 
     sources = [
-        ('coa', coa_totals),
-        ('page', page_totals),
-        ('database', db_totals),
-        ('api', api_totals),
+        (SOURCE_COA, coa_totals),
+        (SOURCE_PAGE, page_totals),
+        (SOURCE_DATABASE, db_totals),
+        (SOURCE_API, api_totals),
     ]
 
     cannabinoid_fields = [
@@ -76,12 +97,13 @@ def merge_cannabinoid_data(
     ]
 
     for field in cannabinoid_fields:
-        for source_name, totals_obj in sources:
+        for source_bit, totals_obj in sources:
             if totals_obj:
                 value = getattr(totals_obj, field, None)
                 if value is not None and value > 0:
-                    setattr(merged, field, value)
-                    sources_used.add(source_name)
+                    merged_values[field] = value
+                    sources_used |= source_bit
                     break
 
-    return merged, list(sources_used)
+    # Build the model once instead of a pydantic __setattr__ per field
+    return Totals(**merged_values), sources_used
@@ -1,9 +1,22 @@
 # Strain name normalization utilities.
 # Single implementation used by both ProfileCacheService and StrainAnalyzer.
 
+import re
+import sys
+from functools import lru_cache
+from typing import Dict, Optional
+
 from app.core.constants import STRAIN_NAME_SUFFIXES
 
+# Characters that are neither alphanumeric nor whitespace (\w also admits '_',
+# so it is listed explicitly); same set as the str.isalnum/isspace test
+_NON_ALNUM_RE = re.compile(r'[^\w\s]|_')
+
+# (' suffix', 'suffix ') pairs, built once instead of per call
+_SUFFIX_PATTERNS = tuple((f' {suffix}', f'{suffix} ') for suffix in STRAIN_NAME_SUFFIXES)
+
 
+@lru_cache(maxsize=4096)
 def normalize_strain_name(name: str, title_case: bool = False) -> str:
     """
     Normalize a strain name for consistent lookups and API matching.
@@ -18,15 +31,18 @@ def normalize_strain_name(name: str, title_case: bool = False) -> str:
         normalize_strain_name("Blue Dream", True)     -> "Blue Dream"
         normalize_strain_name("OG Kush #18")          -> "og kush 18"
         normalize_strain_name("Girl Scout Cookies")   -> "girl scout cookies"
+
+    Suffixes are removed in order with plain substring replaces, exactly as
+    stored profile keys were built. Memoized since strain names repeat.
     """
     name = name.lower()
 
     # Remove common product type suffixes
-    for suffix in STRAIN_NAME_SUFFIXES:
-        name = name.replace(f' {suffix}', '').replace(f'{suffix} ', '')
+    for leading, trailing in _SUFFIX_PATTERNS:
+        name = name.replace(leading, '').replace(trailing, '')
 
     # Clean special characters but keep spaces
-    name = ''.join(c if c.isalnum() or c.isspace() else ' ' for c in name)
+    name = _NON_ALNUM_RE.sub(' ', name)
 
     # Normalize whitespace
     name = ' '.join(name.split()).strip()
@@ -34,3 +50,16 @@ def normalize_strain_name(name: str, title_case: bool = False) -> str:
     if title_case:
         return name.title()
     return name
+
+
+def intern_keys(values: Optional[Dict[str, float]]) -> Optional[Dict[str, float]]:
+    """
+    Return a copy of a terpene/cannabinoid dict with interned keys.
+
+    Keys decoded from JSON columns or cache payloads are fresh string objects;
+    interning them lets later lookups against the standard key literals
+    ("myrcene", "thc", ...) match on identity instead of comparing characters.
+    """
+    if not values:
+        return values
+    return {sys.intern(k): v for k, v in values.items()}
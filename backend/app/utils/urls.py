@@ -0,0 +1,31 @@
+# URL canonicalization for cache keys.
+# Collapses cosmetic URL variations so repeat analyses of the same page
+# share a single cached result.
+
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only carry click/campaign tracking
+TRACKING_PARAMS = frozenset({
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'igshid', 'mc_cid', 'mc_eid', '_ga',
+})
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonicalize a URL for cache lookups.
+
+    Lowercases scheme and host, drops the fragment, tracking parameters
+    (utm_* and common click IDs) and a trailing slash on the path, and sorts
+    the remaining query parameters.
+
+    Examples:
+        canonicalize_url("https://Shop.Example.com/p/blue-dream/?utm_source=x#reviews")
+            -> "https://shop.example.com/p/blue-dream"
+    """
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith('utm_') and k.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ''))
@@ -5,6 +5,7 @@ import pytest
 from unittest.mock import patch, AsyncMock, MagicMock
 from app.services.analyzer import StrainAnalyzer
 from app.models.schemas import Totals, ScrapedData, StrainAPIData
+from app.utils.merging import merge_terpene_data
 
 
 @pytest.fixture
@@ -144,3 +145,22 @@ class TestAnalyzeUrl:
         # page source should be primary since page data was found
         call_args = mock_cache.save_profile.call_args
         assert call_args.kwargs.get('source') == 'page' or (call_args[1] and call_args[1].get('source') == 'page')
+
+    @patch("app.db.base.SessionLocal")
+    @patch("app.services.analyzer.merge_terpene_data", wraps=merge_terpene_data)
+    @patch("app.services.analyzer.kushy_client")
+    @patch("app.services.analyzer.scrape_url")
+    @patch("app.services.analyzer.profile_cache_service")
+    def test_preliminary_merge_reused_without_api_data(self, mock_cache, mock_scrape, mock_kushy, mock_merge,
+                                                        mock_session_cls, analyzer, mock_scraped):
+        mock_scrape.return_value = mock_scraped
+        mock_cache.get_cached_profile_with_aliases.return_value = None
+        mock_kushy.get_strain_data = AsyncMock(return_value=None)
+        analyzer.cannlytics.get_strain_data = AsyncMock(return_value=None)
+        mock_session_cls.return_value = MagicMock()
+
+        result = run_async(analyzer.analyze_url("https://example.com"))
+
+        assert result.terpenes == {"myrcene": 0.35, "limonene": 0.25}
+        assert result.sources == ["page"]
+        mock_merge.assert_called_once()
@@ -0,0 +1,47 @@
+# Tests for app/services/cache.py
+
+import asyncio
+import msgpack
+from unittest.mock import AsyncMock
+from app.services.cache import CacheService
+
+
+def run_async(coro):
+    return asyncio.run(coro)
+
+
+class TestCacheSerialization:
+
+    def test_set_stores_msgpack_bytes(self):
+        service = CacheService()
+        service.redis = AsyncMock()
+
+        run_async(service.set("analysis:abc", {"terpenes": {"myrcene": 0.35}}, ttl=60))
+
+        key, ttl, payload = service.redis.setex.call_args.args
+        assert (key, ttl) == ("analysis:abc", 60)
+        assert msgpack.unpackb(payload, raw=False) == {"terpenes": {"myrcene": 0.35}}
+
+    def test_get_round_trip(self):
+        service = CacheService()
+        service.redis = AsyncMock()
+        value = {"sources": ["page"], "totals": {"thc": 0.2, "cbd": None}}
+        service.redis.get = AsyncMock(return_value=msgpack.packb(value, use_bin_type=True))
+
+        assert run_async(service.get("analysis:abc")) == value
+
+    def test_get_miss(self):
+        service = CacheService()
+        service.redis = AsyncMock()
+        service.redis.get = AsyncMock(return_value=None)
+
+        assert run_async(service.get("analysis:missing")) is None
+
+    def test_rate_limit_reads_binary_counter(self):
+        service = CacheService()
+        service.redis = AsyncMock()
+        service.redis.get = AsyncMock(return_value=b"5")
+
+        allowed, remaining = run_async(service.check_rate_limit("1.2.3.4", limit=30))
+        assert allowed is True
+        assert remaining == 24
@@ -62,3 +62,19 @@ class TestCannabinoidInsights:
         totals = Totals()
         insights = generate_cannabinoid_insights(totals)
         assert insights == []
+
+    def test_repeat_totals_cached_and_isolated(self):
+        from app.services import classifier
+        totals = Totals(thc=18.0, cbd=1.0, cbg=0.02)
+        first = generate_cannabinoid_insights(totals)
+        first.append("mutated by caller")
+        hits = classifier._insights_cached.cache_info().hits
+        second = generate_cannabinoid_insights(Totals(thc=18.0, cbd=1.0, cbg=0.02))
+        assert classifier._insights_cached.cache_info().hits == hits + 1
+        assert "mutated by caller" not in second
+
+    def test_ratio_band_boundaries(self):
+        # Bounds are exclusive: a ratio of exactly 2 is still "Balanced"
+        assert generate_cannabinoid_insights(Totals(thc=2.0, cbd=1.0))[0] == "Balanced THC:CBD (2.0:1 ratio)"
+        assert generate_cannabinoid_insights(Totals(thc=20.0, cbd=1.0))[0] == "High THC (20:1 ratio)"
+        assert generate_cannabinoid_insights(Totals(thc=1.0, cbd=2.0))[0] == "CBD-rich (1:2.0 ratio)"
@@ -0,0 +1,292 @@
+# Tests for app/services/cannlytics_client.py
+
+import asyncio
+import time
+import httpx
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+from app.core.constants import STRAIN_API_CACHE_TTL_SECONDS
+from app.services import cannlytics_client
+from app.services.cannlytics_client import (
+    CannlyticsClient, resolve_coa_analyte, encode_strain_name, ANALYTE_TERPENE, ANALYTE_TOTALS,
+)
+
+
+def run_async(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture(autouse=True)
+def _clear_strain_cache():
+    cannlytics_client._strain_cache.clear()
+    yield
+    cannlytics_client._strain_cache.clear()
+
+
+@pytest.fixture
+def client():
+    c = CannlyticsClient()
+    c.api_key = "test-key"
+    return c
+
+
+def _mock_http(response: httpx.Response):
+    http = MagicMock()
+    http.get = AsyncMock(return_value=response)
+    http.post = AsyncMock(return_value=response)
+    return http
+
+
+class TestResolveCoaAnalyte:
+
+    def test_exact_names(self):
+        assert resolve_coa_analyte("beta-myrcene") == (ANALYTE_TERPENE, "myrcene")
+        assert resolve_coa_analyte("α-pinene") == (ANALYTE_TERPENE, "alpha_pinene")
+        assert resolve_coa_analyte("delta-9-thc") == (ANALYTE_TOTALS, "thc")
+
+    def test_noisy_names_fall_back_to_tokens(self):
+        assert resolve_coa_analyte("β-caryophyllene (bcp)") == (ANALYTE_TERPENE, "caryophyllene")
+        assert resolve_coa_analyte("pinene, beta") == (ANALYTE_TERPENE, "beta_pinene")
+        assert resolve_coa_analyte("total terpenes (%)") == (ANALYTE_TOTALS, "total_terpenes")
+
+    def test_unknown_and_ambiguous(self):
+        assert resolve_coa_analyte("moisture") is None
+        assert resolve_coa_analyte("pinene") is None
+        # Cannabinoids require an exact name
+        assert resolve_coa_analyte("thc (total)") is None
+
+
+class TestEncodeStrainName:
+
+    def test_matches_quote_plus(self):
+        import urllib.parse
+        for name in ["Blue Dream", "GG4", "Girl Scout Cookies #4", "Durban/Poison", "Señorita", "OG Kush 18"]:
+            assert encode_strain_name(name) == urllib.parse.quote_plus(name)
+
+
+class TestParseCoa:
+
+    def test_extracts_terpenes_and_cannabinoids(self, client):
+        payload = {
+            "product_name": "Blue Dream",
+            "lab": {"name": "Test Lab"},
+            "date_tested": "2025-01-01",
+            "results": [
+                {"name": "beta-Myrcene", "value": 0.8},
+                {"name": "d-Limonene", "value": 0.4},
+                {"name": "alpha-Pinene", "value": 0.2},
+                {"name": "β-Pinene", "value": 0.1},
+                {"name": "THCA", "value": 24.1},
+                {"name": "Total Terpenes", "value": 2.1},
+            ],
+        }
+        http = _mock_http(httpx.Response(200, json=payload))
+        with patch("app.services.cannlytics_client.get_http_client", return_value=http):
+            coa = run_async(client.parse_coa("https://example.com/coa.pdf"))
+
+        assert coa.strain_name == "Blue Dream"
+        assert coa.lab_name == "Test Lab"
+        assert coa.terpenes == {"myrcene": 0.8, "limonene": 0.4, "alpha_pinene": 0.2, "beta_pinene": 0.1}
+        assert coa.totals.thca == 24.1
+        assert coa.totals.total_terpenes == 2.1
+
+    def test_no_terpenes_returns_none(self, client):
+        http = _mock_http(httpx.Response(200, json={"results": [{"name": "THC", "value": 20.0}]}))
+        with patch("app.services.cannlytics_client.get_http_client", return_value=http):
+            assert run_async(client.parse_coa("https://example.com/coa.pdf")) is None
+
+    def test_missing_results_returns_none(self, client):
+        http = _mock_http(httpx.Response(200, json={"product_name": "Blue Dream", "results": []}))
+        with patch("app.services.cannlytics_client.get_http_client", return_value=http), \
+                patch("app.services.cannlytics_client.Totals") as totals_cls:
+            assert run_async(client.parse_coa("https://example.com/coa.pdf")) is None
+        totals_cls.assert_not_called()
+
+    def test_non_object_payload_and_null_lab(self, client):
+        http = _mock_http(httpx.Response(200, json=[{"name": "Myrcene", "value": 0.5}]))
+        with patch("app.services.cannlytics_client.get_http_client", return_value=http):
+            assert run_async(client.parse_coa("https://example.com/coa.pdf")) is None
+
+        payload = {"lab": None, "results": [{"name": "Myrcene", "value": 0.5}]}
+        http = _mock_http(httpx.Response(200, json=payload))
+        with patch("app.services.cannlytics_client.get_http_client", return_value=http):
+            coa = run_async(client.parse_coa("https://example.com/coa.pdf"))
+        assert coa.lab_name is None
+        assert coa.terpenes == {"myrcene": 0.5}
+
+    def test_non_200_returns_none(self, client):
+        http = _mock_http(httpx.Response(500))
+        with patch("app.services.cannlytics_client.get_http_client", return_value=http):
+            assert run_async(client.parse_coa("https://example.com/coa.pdf")) is None
+
+    def test_no_api_key(self):
+        c = CannlyticsClient()
+        c.api_key = ""
+        assert run_async(c.parse_coa("https://example.com/coa.pdf")) is None
+
+
+class TestGetStrainData:
+
+    def test_maps_fields(self, client):
+        payload = {"data": {
+            "strain_name": "Blue Dream",
+            "beta_myrcene": 0.45,
+            "d_limonene": "0.3",
+            "total_thc": 21.5,
+            "cbd": None,
+            "unrelated": "x",
+        }}
+        http = _mock_http(httpx.Response(200, json=payload))
+        with patch("app.services.cannlytics_client.get_http_client", return_value=http):
+            data = run_async(client.get_strain_data("Blue Dream"))
+
+        assert data.strain_name == "Blue Dream"
+        assert data.terpenes == {"myrcene": 0.45, "limonene": 0.3}
+        assert data.totals.thc == pytest.approx(0.215)
+        assert data.totals.cbd is None
+        assert data.source == "cannlytics"
+
+    def test_name_falls_back_to_query(self, client):
+        http = _mock_http(httpx.Response(200, json={"data": {"strain_name": "", "name": None, "myrcene": 0.3}}))
+        with patch("app.services.cannlytics_client.get_http_client", return_value=http):
+            data = run_async(client.get_strain_data("Gelato"))
+        assert data.strain_name == "Gelato"
+
+    def test_repeat_lookup_cached(self, client):
+        http = _mock_http(httpx.Response(200, json={"data": {"strain_name": "Gelato", "myrcene": 0.3}}))
+        with patch("app.services.cannlytics_client.get_http_client", return_value=http):
+            first = run_async(client.get_strain_data("Gelato"))
+            second = run_async(CannlyticsClient().get_strain_data(" Gelato "))
+
+        assert second is first
+        http.get.assert_called_once()
+
+    def test_not_found_not_cached(self, client):
+        http = _mock_http(httpx.Response(404))
+        with patch("app.services.cannlytics_client.get_http_client", return_value=http):
+            run_async(client.get_strain_data("Gelato"))
+            run_async(client.get_strain_data("Gelato"))
+
+        assert http.get.call_count == 2
+
+    def test_transport_error_returns_none(self, client):
+        http = MagicMock()
+        http.get = AsyncMock(side_effect=httpx.ConnectError("refused"))
+        with patch("app.services.cannlytics_client.get_http_client", return_value=http):
+            assert run_async(client.get_strain_data("Gelato")) is None
+
+    def test_cancellation_propagates(self, client):
+        http = MagicMock()
+        http.get = AsyncMock(side_effect=asyncio.CancelledError())
+        with patch("app.services.cannlytics_client.get_http_client", return_value=http):
+            with pytest.raises(asyncio.CancelledError):
+                run_async(client.get_strain_data("Gelato"))
+
+    def test_missing_data_key(self, client):
+        http = _mock_http(httpx.Response(200, json={"error": "not found"}))
+        with patch("app.services.cannlytics_client.get_http_client", return_value=http):
+            assert run_async(client.get_strain_data("Nope")) is None
+
+    def test_invalid_json_returns_none(self, client):
+        http = _mock_http(httpx.Response(200, content=b"<html>"))
+        with patch("app.services.cannlytics_client.get_http_client", return_value=http):
+            assert run_async(client.get_strain_data("Nope")) is None
+
+    def test_empty_strain_returns_none(self, client):
+        http = _mock_http(httpx.Response(200, json={"data": {"strain_name": "Empty"}}))
+        with patch("app.services.cannlytics_client.get_http_client", return_value=http):
+            assert run_async(client.get_strain_data("Empty")) is None
+
+    def test_cannabinoid_only_needs_major_cannabinoid(self, client):
+        http = _mock_http(httpx.Response(200, json={"data": {"strain_name": "Minor", "thcv": 0.5}}))
+        with patch("app.services.cannlytics_client.get_http_client", return_value=http):
+            assert run_async(client.get_strain_data("Minor")) is None
+
+        http = _mock_http(httpx.Response(200, json={"data": {"strain_name": "Major", "cbga": 1.2}}))
+        with patch("app.services.cannlytics_client.get_http_client", return_value=http):
+            data = run_async(client.get_strain_data("Major"))
+        assert data.terpenes == {}
+        assert data.totals.cbg == pytest.approx(0.012)
+
+
+class TestRedisCache:
+
+    @staticmethod
+    def _redis(entry=None):
+        cache = MagicMock()
+        cache.get = AsyncMock(return_value=entry)
+        cache.set = AsyncMock()
+        return cache
+
+    @staticmethod
+    def _entry(age, etag='"v1"'):
+        data = {"strain_name": "Gelato", "terpenes": {"myrcene": 0.3}, "match_score": 1.0, "source": "cannlytics"}
+        return {"etag": etag, "fetched_at": time.time() - age, "data": data}
+
+    def test_fresh_entry_skips_request(self, client):
+        cache = self._redis(self._entry(age=10))
+        http = _mock_http(httpx.Response(500))
+        with patch("app.services.cannlytics_client.cache_service", cache), \
+                patch("app.services.cannlytics_client.get_http_client", return_value=http):
+            data = run_async(client.get_strain_data("Gelato"))
+
+        assert data.terpenes == {"myrcene": 0.3}
+        http.get.assert_not_called()
+
+    def test_stale_entry_revalidated_with_etag(self, client):
+        cache = self._redis(self._entry(age=STRAIN_API_CACHE_TTL_SECONDS + 1))
+        http = _mock_http(httpx.Response(304))
+        with patch("app.services.cannlytics_client.cache_service", cache), \
+                patch("app.services.cannlytics_client.get_http_client", return_value=http):
+            data = run_async(client.get_strain_data("Gelato"))
+
+        assert data.terpenes == {"myrcene": 0.3}
+        assert http.get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+        key, stored = cache.set.call_args.args
+        assert key == "strain_api:Gelato"
+        assert stored["etag"] == '"v1"'
+
+    def test_fetch_stores_etag(self, client):
+        cache = self._redis()
+        response = httpx.Response(200, json={"data": {"strain_name": "Gelato", "myrcene": 0.3}}, headers={"ETag": '"v2"'})
+        with patch("app.services.cannlytics_client.cache_service", cache), \
+                patch("app.services.cannlytics_client.get_http_client", return_value=_mock_http(response)):
+            run_async(client.get_strain_data("Gelato"))
+
+        _, stored = cache.set.call_args.args
+        assert stored["etag"] == '"v2"'
+        assert stored["data"]["terpenes"] == {"myrcene": 0.3}
+
+    def test_coa_cache_hit_skips_extraction(self, client):
+        cached = {"strain_name": "Blue Dream", "terpenes": {"myrcene": 0.8}, "totals": {"thca": 24.1}}
+        cache = self._redis(cached)
+        http = _mock_http(httpx.Response(500))
+        with patch("app.services.cannlytics_client.cache_service", cache), \
+                patch("app.services.cannlytics_client.get_http_client", return_value=http):
+            coa = run_async(client.parse_coa("https://Example.com/coa.pdf?utm_source=x"))
+
+        assert coa.totals.thca == 24.1
+        http.post.assert_not_called()
+        assert cache.get.call_args.args[0].startswith("coa:")
+
+
+class TestBatch:
+
+    def test_parse_coa_batch_preserves_order(self, client):
+        async def fake_parse(url):
+            if url == "boom":
+                raise RuntimeError("unexpected")
+            return url.upper()
+
+        with patch.object(client, "parse_coa", side_effect=fake_parse):
+            results = run_async(client.parse_coa_batch(["a", "boom", "b"]))
+
+        assert results == ["A", None, "B"]
+
+    def test_get_strain_data_batch(self, client):
+        http = _mock_http(httpx.Response(200, json={"data": {"strain_name": "Gelato", "myrcene": 0.3}}))
+        with patch("app.services.cannlytics_client.get_http_client", return_value=http):
+            results = run_async(client.get_strain_data_batch(["Gelato", "Runtz"]))
+
+        assert [r.terpenes for r in results] == [{"myrcene": 0.3}, {"myrcene": 0.3}]
+        assert http.get.call_count == 2
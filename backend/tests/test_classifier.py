@@ -7,6 +7,8 @@ from app.services.classifier import (
     classify_terpene_profile,
     normalize_terpene_profile,
     generate_summary,
+    get_top_terpene,
+    is_within_range,
     get_traditional_label,
     TRADITIONAL_LABELS,
 )
@@ -31,6 +33,13 @@ class TestNormalization:
         assert "limonene" in normalized
         assert "caryophyllene" in normalized
 
+    def test_normalize_greek_and_hyphenated_names(self):
+        """Test Greek-letter and hyphenated spellings fold to standard names"""
+        profile = {"α-Pinene": 0.2, "β-pinene": 0.2, "β-ocimene": 0.3, "Beta-Myrcene": 0.3}
+        normalized = normalize_terpene_profile(profile)
+
+        assert set(normalized) == {"alpha_pinene", "beta_pinene", "ocimene", "myrcene"}
+
     def test_normalize_filters_zeros(self):
         """Test that zero values are filtered out"""
         profile = {"myrcene": 0.5, "limonene": 0.0, "caryophyllene": 0.5}
@@ -103,6 +112,84 @@ class TestClassification:
         category = classify_terpene_profile(profile)
         assert category == "BLUE"
 
+    def test_classify_all_none_profile_fallback(self):
+        """Test that a profile with no positive values returns BLUE"""
+        assert classify_terpene_profile({"myrcene": None, "limonene": 0}) == "BLUE"
+
+
+class TestStandardizedFastPath:
+    """Test classification of already-standardized profiles."""
+
+    def test_matches_public_classifier(self):
+        from app.services.classifier import classify_standardized_profile
+        profiles = [
+            {"myrcene": 0.5, "limonene": 0.3, "caryophyllene": 0.2},
+            {"terpinolene": 0.4, "myrcene": 0.2, "ocimene": 0.1},
+            {"alpha_pinene": 0.3, "beta_pinene": 0.2, "myrcene": 0.1},
+            {"limonene": 45.0, "caryophyllene": 20.0, "linalool": 10.0},
+        ]
+        for profile in profiles:
+            assert classify_standardized_profile(profile) == classify_terpene_profile(profile)
+
+    def test_empty(self):
+        from app.services.classifier import classify_standardized_profile
+        assert classify_standardized_profile({}) == "BLUE"
+
+
+class TestTopTerpene:
+    """Test dominant terpene selection."""
+
+    def test_top_terpene(self):
+        assert get_top_terpene({"myrcene": 0.2, "limonene": 0.5, "pinene": 0.3}) == ("limonene", 0.5)
+
+    def test_tie_keeps_first(self):
+        assert get_top_terpene({"limonene": 0.4, "myrcene": 0.4}) == ("limonene", 0.4)
+
+    def test_empty(self):
+        assert get_top_terpene({}) == ("", 0.0)
+
+
+class TestWithinRange:
+    """Test the balanced-profile tolerance check."""
+
+    def test_within_and_outside_tolerance(self):
+        assert is_within_range((0.30, 0.32, 0.28)) is True
+        assert is_within_range((0.20, 0.40, 0.30)) is False
+        assert is_within_range(()) is False
+
+    def test_deviation_from_mean_not_spread(self):
+        # Spread (0.3) is within 2 * 0.15 * mean, but 1.0 sits 16.7% below the mean
+        assert is_within_range((1.0, 1.3, 1.3)) is False
+
+
+class TestMemoization:
+    """Test that repeat profiles are served from the classifier caches."""
+
+    def test_repeat_profile_hits_cache(self):
+        from app.services import classifier
+        profile = {"myrcene": 0.41, "limonene": 0.22, "pinene": 0.01}
+        first = classify_terpene_profile(profile)
+        hits = classifier._classify_cached.cache_info().hits
+        assert classify_terpene_profile(dict(profile)) == first
+        assert classifier._classify_cached.cache_info().hits == hits + 1
+
+    def test_batch_matches_single_and_dedups(self):
+        from unittest.mock import patch
+        from app.services import classifier
+        profiles = [
+            {"myrcene": 0.6, "limonene": 0.1},
+            {"terpinolene": 0.5, "myrcene": 0.2},
+            {"myrcene": 0.6, "limonene": 0.1},
+        ]
+        with patch.object(classifier, "_classify_profile", wraps=classifier._classify_profile) as spy:
+            categories = classifier.classify_terpene_profiles(profiles)
+        assert categories == [classify_terpene_profile(p) for p in profiles]
+        assert spy.call_count == 2
+
+    def test_different_profiles_not_conflated(self):
+        assert classify_terpene_profile({"myrcene": 0.6, "limonene": 0.1}) == "BLUE"
+        assert classify_terpene_profile({"limonene": 0.6, "myrcene": 0.1}) == "YELLOW"
+
 
 class TestSummaryGeneration:
     """Test summary text generation."""
@@ -183,6 +270,10 @@ class TestTraditionalLabels:
         assert get_traditional_label("RED") == "Hybrid"
         assert get_traditional_label("BLUE") == "Classic Indica"
 
+    def test_get_traditional_label_runtime_string(self):
+        """Test labels resolve for category strings built at runtime"""
+        assert get_traditional_label("".join(["PUR", "PLE"])) == "Modern Indica"
+
     def test_get_traditional_label_unknown(self):
         """get_traditional_label falls back to 'Hybrid' for unknown categories."""
         assert get_traditional_label("UNKNOWN") == "Hybrid"
@@ -0,0 +1,17 @@
+# Tests for app/db/base.py
+
+import orjson
+from app.core.constants import DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE_SECONDS
+from app.db.base import engine
+
+
+def test_pool_settings():
+    pool = engine.pool
+    assert pool.size() == DB_POOL_SIZE
+    assert pool._max_overflow == DB_MAX_OVERFLOW
+    assert pool._pre_ping is True
+    assert pool._recycle == DB_POOL_RECYCLE_SECONDS
+
+
+def test_json_columns_decoded_with_orjson():
+    assert engine.dialect._json_deserializer is orjson.loads
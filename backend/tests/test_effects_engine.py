@@ -61,6 +61,20 @@ class TestGenerateEffectsProfile:
         assert generate_effects_profile(terpenes, Totals(thc=12.0))["intensity_estimate"] == "Moderate"
         assert generate_effects_profile(terpenes, Totals(thc=5.0))["intensity_estimate"] == "Low-Moderate"
 
+    def test_intensity_boundaries_are_exclusive(self):
+        terpenes = {"myrcene": 0.5, "limonene": 0.5}
+        assert generate_effects_profile(terpenes, Totals(thc=28.0))["intensity_estimate"] == "High"
+        assert generate_effects_profile(terpenes, Totals(thc=10.0))["intensity_estimate"] == "Low-Moderate"
+        assert generate_effects_profile(terpenes, Totals())["intensity_estimate"] == "Unknown"
+
+    def test_thc_duration_and_warnings(self):
+        terpenes = {"myrcene": 0.5, "limonene": 0.5}
+        base = generate_effects_profile(terpenes, Totals(thc=20.0))
+        high = generate_effects_profile(terpenes, Totals(thc=25.5))
+        very_high = generate_effects_profile(terpenes, Totals(thc=31.0))
+        assert int(high["duration"].split("-")[0]) == int(base["duration"].split("-")[0]) + 30
+        assert len(very_high["potential_negatives"]) == len(high["potential_negatives"]) + 1
+
     def test_best_contexts_populated(self):
         terpenes = {"myrcene": 0.5, "limonene": 0.3, "caryophyllene": 0.2}
         result = generate_effects_profile(terpenes, Totals(), None)
@@ -77,3 +91,113 @@ class TestGenerateEffectsProfile:
         assert "min" in result["onset"]
         assert "min" in result["peak"]
         assert "min" in result["duration"]
+
+    def test_unknown_terpenes_ignored_in_balance(self):
+        base = generate_effects_profile({"myrcene": 0.5, "limonene": 0.5}, Totals(thc=20.0))
+        with_unknown = generate_effects_profile({"myrcene": 0.4, "limonene": 0.4, "camphene": 0.2}, Totals(thc=20.0))
+        assert with_unknown["body_mind_balance"] == base["body_mind_balance"]
+
+    def test_minor_terpenes_skip_contexts_and_negatives(self):
+        # linalool at 5% is below both thresholds; caryophyllene at 8% only adds contexts
+        terpenes = {"myrcene": 0.87, "caryophyllene": 0.08, "linalool": 0.05}
+        result = generate_effects_profile(terpenes, Totals())
+        assert "Anxiety relief" not in result["best_contexts"]
+        assert "Pain management" in result["best_contexts"]
+        assert "Dry mouth" not in result["potential_negatives"]
+        assert "Drowsiness" in result["potential_negatives"]
+
+    def test_pinene_interaction_uses_combined_fraction(self):
+        # Neither pinene clears 0.15 alone; together they do
+        terpenes = {"myrcene": 0.8, "alpha_pinene": 0.1, "beta_pinene": 0.1}
+        interactions = generate_effects_profile(terpenes, Totals())["terpene_interactions"]
+        assert any(i.startswith("Pinene") for i in interactions)
+        terpenes = {"myrcene": 0.9, "alpha_pinene": 0.1}
+        interactions = generate_effects_profile(terpenes, Totals())["terpene_interactions"]
+        assert not any(i.startswith("Pinene") for i in interactions)
+
+
+class TestMemoization:
+    """Test that repeat profiles are served from the effects cache."""
+
+    def test_repeat_profile_hits_cache(self):
+        from app.services import effects_engine
+        terpenes = {"myrcene": 0.47, "limonene": 0.31, "linalool": 0.22}
+        first = generate_effects_profile(terpenes, Totals(thc=21.0), "BLUE")
+        hits = effects_engine._effects_cached.cache_info().hits
+        assert generate_effects_profile(dict(terpenes), Totals(thc=21.0), "BLUE") == first
+        assert effects_engine._effects_cached.cache_info().hits == hits + 1
+
+    def test_cached_lists_not_shared(self):
+        terpenes = {"myrcene": 0.6, "caryophyllene": 0.4}
+        first = generate_effects_profile(terpenes, Totals(thc=26.0))
+        first["best_contexts"].append("mutated")
+        first["potential_negatives"].clear()
+        second = generate_effects_profile(terpenes, Totals(thc=26.0))
+        assert "mutated" not in second["best_contexts"]
+        assert second["potential_negatives"]
+
+    def test_totals_and_category_are_part_of_key(self):
+        terpenes = {"myrcene": 0.6, "caryophyllene": 0.4}
+        low = generate_effects_profile(terpenes, Totals(thc=5.0), "BLUE")
+        high = generate_effects_profile(terpenes, Totals(thc=30.0), "BLUE")
+        assert low["intensity_estimate"] != high["intensity_estimate"]
+
+    def test_fraction_cutoffs_are_exclusive(self):
+        from app.services.effects_engine import _aggregate_terpenes, _collect_negatives
+        # Exactly at the cutoffs: 0.05 adds no contexts, 0.10 adds no negatives
+        _, active, _, _, _, _, onset_mod, _, contexts, negative_mask = _aggregate_terpenes(
+            {"limonene": 0.05, "myrcene": 0.10, "caryophyllene": 0.85}, 1.0,
+        )
+        negatives = _collect_negatives(negative_mask, 0)
+        assert "Mood boost" not in contexts
+        assert "Nighttime" in contexts
+        assert "Drowsiness" not in negatives
+        assert "Dry mouth" in negatives
+        assert onset_mod == 0.0  # limonene is the only non-zero onset modifier here
+        assert active == 2
+
+    def test_negatives_deduplicated_in_table_order(self):
+        # myrcene and linalool both list "Drowsiness"
+        terpenes = {"linalool": 0.4, "myrcene": 0.4, "caryophyllene": 0.2}
+        negatives = generate_effects_profile(terpenes, Totals(thc=31.0))["potential_negatives"]
+        assert negatives == [
+            "Drowsiness", "Couch-lock at high levels", "Dry mouth",
+            "High THC may cause anxiety or paranoia in sensitive users",
+            "Very high THC — start with a low dose",
+        ]
+
+    def test_single_prominent_terpene_has_no_interactions(self):
+        terpenes = {"myrcene": 0.9, "linalool": 0.05, "humulene": 0.05}
+        assert generate_effects_profile(terpenes, Totals())["terpene_interactions"] == []
+
+    def test_top_two_terpenes_ties_keep_order(self):
+        from app.services.effects_engine import _top_two_terpenes
+        assert _top_two_terpenes({"a": 0.2, "b": 0.5, "c": 0.5, "d": 0.1}) == ("b", "c")
+        assert _top_two_terpenes({"a": 0.3, "b": 0.1, "c": 0.3}) == ("a", "c")
+        assert _top_two_terpenes({"a": 0.3}) == ("a", None)
+        assert _top_two_terpenes({}) == (None, None)
+
+
+class TestGenerateEffectsAnalysis:
+
+    def test_matches_validated_model(self):
+        from app.models.schemas import EffectsAnalysis
+        from app.services.effects_engine import generate_effects_analysis
+        terpenes = {"myrcene": 0.5, "limonene": 0.3, "caryophyllene": 0.2}
+        built = generate_effects_analysis(terpenes, Totals(thc=26.0), "BLUE")
+        validated = EffectsAnalysis(**generate_effects_profile(terpenes, Totals(thc=26.0), "BLUE"))
+        assert built == validated
+        assert built.model_dump() == validated.model_dump()
+
+    def test_empty_profile_returns_none(self):
+        from app.services.effects_engine import generate_effects_analysis
+        assert generate_effects_analysis({}) is None
+        assert generate_effects_analysis({"myrcene": 0.0}) is None
+
+    def test_timeline_numeric_bounds_match_strings(self):
+        from app.services.effects_engine import format_timeline
+        result = generate_effects_profile({"myrcene": 0.5, "limonene": 0.5}, Totals(thc=26.0, cbd=6.0))
+        for field in ("onset", "peak", "duration"):
+            low, high = result[f"{field}_min"], result[f"{field}_max"]
+            assert low <= high
+            assert result[field] == format_timeline(low, high)
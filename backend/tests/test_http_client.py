@@ -0,0 +1,24 @@
+# Tests for app/services/http_client.py
+
+import asyncio
+from app.services import http_client
+
+
+class TestSharedHttpClient:
+
+    def test_reuses_single_client(self):
+        assert http_client.get_http_client() is http_client.get_http_client()
+
+    def test_close_then_recreate(self):
+        first = http_client.get_http_client()
+        asyncio.run(http_client.close_http_client())
+        assert first.is_closed
+        second = http_client.get_http_client()
+        assert second is not first
+        assert not second.is_closed
+
+    def test_pool_settings(self):
+        client = http_client.get_http_client()
+        assert client.timeout.connect == 5.0
+        assert client.timeout.read == 15.0
+        assert http_client.HTTP_LIMITS.keepalive_expiry == 60.0
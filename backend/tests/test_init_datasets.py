@@ -87,6 +87,19 @@ class TestSafeFloat:
         assert safe_float(3.14) == 3.14
         assert safe_float(42) == 42.0
 
+    def test_numeric_non_positive_and_bool(self):
+        assert safe_float(0) is None
+        assert safe_float(-2.5) is None
+        assert safe_float(float("nan")) is None
+        assert safe_float(True) is None
+
+    def test_scientific_and_signed_strings(self):
+        assert safe_float("1.5e-2") == 0.015
+        assert safe_float("+2") == 2.0
+        assert safe_float(".5") == 0.5
+        assert safe_float("inf") is None
+        assert safe_float("1,5") is None
+
 
 # ---------------------------------------------------------------------------
 # Per-dataset marker tests
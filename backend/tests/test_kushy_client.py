@@ -0,0 +1,101 @@
+# Tests for app/services/kushy_client.py
+
+import asyncio
+import httpx
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+from app.services import kushy_client
+from app.services.kushy_client import KushyClient, build_strain_index
+
+STRAINS = [
+    {"name": "Blue Dream", "thc": "18.5", "cbd": "0.1"},
+    {"name": "Sour Diesel", "thc": "20"},
+    {"name": "No Data Kush"},
+]
+
+
+def run_async(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture(autouse=True)
+def _clear_strain_list_cache():
+    kushy_client._strain_list_cache.clear()
+    # Each test runs its own event loop; don't reuse a lock bound to an old one
+    kushy_client._strain_list_lock = asyncio.Lock()
+    yield
+    kushy_client._strain_list_cache.clear()
+
+
+def _mock_http(response: httpx.Response):
+    http = MagicMock()
+    http.get = AsyncMock(return_value=response)
+    return http
+
+
+class TestBuildStrainIndex:
+
+    def test_skips_bad_entries_and_keeps_first_duplicate(self):
+        first = {"name": "OG Kush", "thc": "20"}
+        by_name, names = build_strain_index(
+            [first, "junk", {"name": ""}, {"name": 42}, {"name": "og kush", "thc": "1"}]
+        )
+        assert by_name == {"og kush": first}
+        assert [n for n, _ in names] == ["og kush", "og kush"]
+
+
+class TestGetStrainData:
+
+    def test_match_parses_cannabinoids(self):
+        http = _mock_http(httpx.Response(200, json=STRAINS))
+        with patch("app.services.kushy_client.get_http_client", return_value=http):
+            result = run_async(KushyClient().get_strain_data("blue dream"))
+        assert result.strain_name == "Blue Dream"
+        assert result.totals.thc == pytest.approx(0.185)
+        assert result.source == "kushy"
+
+    def test_no_match_or_no_data(self):
+        http = _mock_http(httpx.Response(200, json=STRAINS))
+        with patch("app.services.kushy_client.get_http_client", return_value=http):
+            assert run_async(KushyClient().get_strain_data("gelato")) is None
+            assert run_async(KushyClient().get_strain_data("no data")) is None
+
+    def test_exact_name_beats_earlier_partial_match(self):
+        strains = [{"name": "Blue Dream Haze", "thc": "10"}, {"name": "Blue Dream", "thc": "20"}]
+        http = _mock_http(httpx.Response(200, json=strains))
+        with patch("app.services.kushy_client.get_http_client", return_value=http):
+            result = run_async(KushyClient().get_strain_data("Blue Dream"))
+        assert result.strain_name == "Blue Dream"
+
+    def test_strain_list_fetched_once(self):
+        http = _mock_http(httpx.Response(200, json=STRAINS))
+        client = KushyClient()
+        with patch("app.services.kushy_client.get_http_client", return_value=http):
+            run_async(client.get_strain_data("blue dream"))
+            run_async(client.get_strain_data("sour diesel"))
+        assert http.get.await_count == 1
+
+    def test_concurrent_lookups_share_one_fetch(self):
+        http = _mock_http(httpx.Response(200, json=STRAINS))
+        client = KushyClient()
+
+        async def lookup_many():
+            return await asyncio.gather(*(client.get_strain_data("diesel") for _ in range(5)))
+
+        with patch("app.services.kushy_client.get_http_client", return_value=http):
+            results = run_async(lookup_many())
+        assert all(r.strain_name == "Sour Diesel" for r in results)
+        assert http.get.await_count == 1
+
+    def test_failed_fetch_not_cached(self):
+        http = _mock_http(httpx.Response(503))
+        client = KushyClient()
+        with patch("app.services.kushy_client.get_http_client", return_value=http):
+            assert run_async(client.get_strain_data("blue dream")) is None
+            assert run_async(client.get_strain_data("blue dream")) is None
+        assert http.get.await_count == 2
+
+    def test_non_list_response(self):
+        http = _mock_http(httpx.Response(200, json={"error": "nope"}))
+        with patch("app.services.kushy_client.get_http_client", return_value=http):
+            assert run_async(KushyClient().get_strain_data("blue dream")) is None
@@ -1,6 +1,6 @@
 # Tests for app/utils/matching.py
 
-from app.utils.matching import fuzzy_match_strain
+from app.utils.matching import fuzzy_match_strain, preprocess_candidates
 
 
 class TestFuzzyMatchStrain:
@@ -37,11 +37,19 @@ class TestFuzzyMatchStrain:
     def test_case_insensitive_matching(self):
         candidates = ["Blue Dream", "OG Kush"]
         match, score = fuzzy_match_strain("blue dream", candidates)
-        # rapidfuzz is case-sensitive, but the match should still be reasonable
-        assert score > 0.0
+        # default_process lowercases both sides before scoring
+        assert match == "Blue Dream"
+        assert score == 1.0
 
     def test_returns_best_of_multiple(self):
         candidates = ["blue dream", "blue cheese", "blue cookies"]
         match, score = fuzzy_match_strain("blue dream", candidates)
         assert match == "blue dream"
         assert score == 1.0
+
+    def test_preprocessed_candidates(self):
+        candidates = preprocess_candidates(["Blue Dream", "OG Kush #18"])
+        assert candidates == ("blue dream", "og kush  18")
+        match, score = fuzzy_match_strain("OG Kush #18", candidates, preprocessed=True)
+        assert match == "og kush  18"
+        assert score == 1.0
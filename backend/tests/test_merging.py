@@ -1,6 +1,9 @@
 # Tests for app/utils/merging.py
 
-from app.utils.merging import merge_terpene_data, merge_cannabinoid_data
+from app.utils.merging import (
+    merge_terpene_data, merge_cannabinoid_data, sources_from_mask,
+    SOURCE_COA, SOURCE_PAGE, SOURCE_DATABASE, SOURCE_API,
+)
 from app.models.schemas import Totals
 
 
@@ -13,28 +16,28 @@ class TestMergeTerpeneData:
         api = {"myrcene": 0.1}
         merged, sources = merge_terpene_data(coa, page, db, api)
         assert merged["myrcene"] == 0.5
-        assert "coa" in sources
+        assert sources & SOURCE_COA
 
     def test_page_over_db_and_api(self):
         merged, sources = merge_terpene_data(
             {}, {"limonene": 0.4}, {"limonene": 0.2}, {"limonene": 0.1}
         )
         assert merged["limonene"] == 0.4
-        assert "page" in sources
+        assert sources & SOURCE_PAGE
 
     def test_db_over_api(self):
         merged, sources = merge_terpene_data(
             {}, {}, {"caryophyllene": 0.3}, {"caryophyllene": 0.1}
         )
         assert merged["caryophyllene"] == 0.3
-        assert "database" in sources
+        assert sources & SOURCE_DATABASE
 
     def test_api_fallback(self):
         merged, sources = merge_terpene_data(
             {}, {}, {}, {"humulene": 0.15}
         )
         assert merged["humulene"] == 0.15
-        assert "api" in sources
+        assert sources & SOURCE_API
 
     def test_gap_filling(self):
         # COA has myrcene, page has limonene — both should be in merged
@@ -43,8 +46,8 @@ class TestMergeTerpeneData:
         merged, sources = merge_terpene_data(coa, page, {}, {})
         assert merged["myrcene"] == 0.5
         assert merged["limonene"] == 0.3
-        assert "coa" in sources
-        assert "page" in sources
+        assert sources & SOURCE_COA
+        assert sources & SOURCE_PAGE
 
     def test_zero_values_skipped(self):
         coa = {"myrcene": 0.0}
@@ -61,7 +64,7 @@ class TestMergeTerpeneData:
     def test_all_empty(self):
         merged, sources = merge_terpene_data({}, {}, {}, {})
         assert merged == {}
-        assert sources == []
+        assert sources == 0
 
     def test_multiple_terpenes_mixed_sources(self):
         coa = {"myrcene": 0.5}
@@ -73,6 +76,7 @@ class TestMergeTerpeneData:
         assert merged["limonene"] == 0.4  # from page
         assert merged["caryophyllene"] == 0.3  # from db
         assert merged["humulene"] == 0.1  # from api
+        assert sources == SOURCE_COA | SOURCE_PAGE | SOURCE_DATABASE | SOURCE_API
 
     def test_none_source_dicts(self):
         # None dicts should be handled (treated as empty)
@@ -95,7 +99,7 @@ class TestMergeCannabinoidData:
         page = Totals(thc=0.20)
         merged, sources = merge_cannabinoid_data(coa, page, Totals(), Totals())
         assert merged.thc == 0.25
-        assert "coa" in sources
+        assert sources & SOURCE_COA
 
     def test_gap_filling_cannabinoids(self):
         coa = Totals(thc=0.25)
@@ -112,11 +116,20 @@ class TestMergeCannabinoidData:
 
     def test_all_empty(self):
         merged, sources = merge_cannabinoid_data(Totals(), Totals(), Totals(), Totals())
-        assert sources == []
+        assert sources == 0
 
     def test_api_fallback_cannabinoids(self):
         api = Totals(thca=0.22, cbg=0.01)
         merged, sources = merge_cannabinoid_data(Totals(), Totals(), Totals(), api)
         assert merged.thca == 0.22
         assert merged.cbg == 0.01
-        assert "api" in sources
+        assert sources & SOURCE_API
+
+
+class TestSourcesFromMask:
+
+    def test_priority_order(self):
+        assert sources_from_mask(SOURCE_API | SOURCE_COA | SOURCE_DATABASE) == ["coa", "database", "api"]
+
+    def test_empty_mask(self):
+        assert sources_from_mask(0) == []
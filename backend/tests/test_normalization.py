@@ -1,6 +1,9 @@
 # Tests for app/utils/normalization.py
 
-from app.utils.normalization import normalize_strain_name
+import json
+import sys
+
+from app.utils.normalization import normalize_strain_name, intern_keys
 
 
 class TestNormalizeStrainName:
@@ -29,6 +32,10 @@ class TestNormalizeStrainName:
         result = normalize_strain_name("OG Kush #18")
         assert result == "og kush 18"
 
+    def test_underscores_and_unicode(self):
+        # '_' is not alphanumeric; accented letters are
+        assert normalize_strain_name("Jack_Herer Café") == "jack herer café"
+
     def test_whitespace_normalization(self):
         result = normalize_strain_name("  Blue   Dream  ")
         assert result == "blue dream"
@@ -40,3 +47,16 @@ class TestNormalizeStrainName:
     def test_already_clean(self):
         result = normalize_strain_name("gelato")
         assert result == "gelato"
+
+
+class TestInternKeys:
+
+    def test_keys_interned(self):
+        decoded = json.loads('{"myrcene": 0.5, "alpha_pinene": 0.1}')
+        result = intern_keys(decoded)
+        assert result == decoded
+        assert all(k is sys.intern(k) for k in result)
+
+    def test_empty_and_none_passthrough(self):
+        assert intern_keys(None) is None
+        assert intern_keys({}) == {}
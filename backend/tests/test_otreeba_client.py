@@ -0,0 +1,202 @@
+# Tests for app/services/otreeba_client.py
+
+import asyncio
+import httpx
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+from app.services.otreeba_client import OtreebaClient, resolve_otreeba_analyte
+
+
+def run_async(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def client():
+    c = OtreebaClient()
+    c.api_key = "test-key"
+    return c
+
+
+def _mock_http(response: httpx.Response):
+    http = MagicMock()
+    http.get = AsyncMock(return_value=response)
+    return http
+
+
+class TestGetStrainData:
+
+    def test_parses_lab_results(self, client):
+        payload = {"data": [{
+            "name": "Blue Dream",
+            "thc": "18",
+            "labResults": [{"analytes": [
+                {"name": "beta-Myrcene", "value": "0.5"},
+                {"name": "alpha-Pinene", "value": "0.2"},
+                {"name": "CBG", "value": "1"},
+            ]}],
+        }]}
+        http = _mock_http(httpx.Response(200, json=payload))
+        with patch("app.services.otreeba_client.get_http_client", return_value=http):
+            result = run_async(client.get_strain_data("Blue Dream"))
+        assert result.strain_name == "Blue Dream"
+        assert set(result.terpenes) == {"myrcene", "alpha_pinene"}
+        assert result.totals.thc is not None
+        assert result.totals.cbg is not None
+        # Requests go through the shared pooled client
+        assert http.get.await_args.kwargs["headers"]["X-API-Key"] == "test-key"
+        # Only the top match is parsed, so only one is requested
+        assert http.get.await_args.kwargs["params"]["count"] == 1
+
+    def test_cannabinoids_only_and_unmapped_values_ignored(self, client):
+        payload = {"data": [{
+            "name": "Sour Diesel",
+            "labResults": [{"analytes": [
+                {"name": "CBN", "value": "0.4"},
+                {"name": "Moisture", "value": "nd"},
+            ]}],
+        }]}
+        http = _mock_http(httpx.Response(200, json=payload))
+        with patch("app.services.otreeba_client.get_http_client", return_value=http):
+            result = run_async(client.get_strain_data("Sour Diesel"))
+        assert result.terpenes == {}
+        assert result.totals.cbn == 0.4
+
+    def test_no_api_key_skips_request(self):
+        c = OtreebaClient()
+        c.api_key = ""
+        http = _mock_http(httpx.Response(200, json={"data": []}))
+        with patch("app.services.otreeba_client.get_http_client", return_value=http):
+            assert run_async(c.get_strain_data("Blue Dream")) is None
+        http.get.assert_not_called()
+
+    def test_error_status_and_empty_data(self, client):
+        for response in (httpx.Response(500), httpx.Response(200, json={"data": []})):
+            with patch("app.services.otreeba_client.get_http_client", return_value=_mock_http(response)):
+                assert run_async(client.get_strain_data("Blue Dream")) is None
+
+
+class TestResolveAnalyte:
+
+    @pytest.mark.parametrize("name,expected", [
+        ("Myrcene", ("terpene", "myrcene")),
+        ("beta-Myrcene", ("terpene", "myrcene")),
+        ("α-Pinene", ("terpene", "alpha_pinene")),
+        ("beta pinene", ("terpene", "beta_pinene")),
+        ("Pinene", None),
+        ("THC", ("totals", "thc")),
+        ("Delta-9 THC", ("totals", "thc")),
+        ("CBDA", ("totals", "cbda")),
+        ("CBDV", None),
+        ("Moisture", None),
+    ])
+    def test_mapping(self, name, expected):
+        assert resolve_otreeba_analyte(name) == expected
+
+
+class TestCaching:
+
+    PAYLOAD = {"data": [{"name": "Blue Dream", "thc": "18"}]}
+
+    def test_hit_skips_request(self, client):
+        http = _mock_http(httpx.Response(200, json=self.PAYLOAD))
+        with patch("app.services.otreeba_client.get_http_client", return_value=http):
+            first = run_async(client.get_strain_data("Blue Dream"))
+            second = run_async(client.get_strain_data("  blue dream "))
+        assert second is first
+        assert http.get.await_count == 1
+
+    def test_miss_is_negatively_cached(self, client):
+        http = _mock_http(httpx.Response(200, json={"data": []}))
+        with patch("app.services.otreeba_client.get_http_client", return_value=http):
+            assert run_async(client.get_strain_data("Nope")) is None
+            assert run_async(client.get_strain_data("nope")) is None
+        assert http.get.await_count == 1
+        assert client._cache.get("nope") is None
+
+    def test_concurrent_lookups_share_one_request(self, client):
+        async def slow_get(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json=self.PAYLOAD)
+
+        http = MagicMock()
+        http.get = AsyncMock(side_effect=slow_get)
+
+        async def run():
+            return await asyncio.gather(*(client.get_strain_data("Blue Dream") for _ in range(5)))
+
+        with patch("app.services.otreeba_client.get_http_client", return_value=http):
+            results = run_async(run())
+        assert http.get.await_count == 1
+        assert all(r is results[0] for r in results)
+        assert client._inflight == {}
+
+
+class TestRetry:
+
+    PAYLOAD = {"data": [{"name": "Blue Dream", "thc": "18"}]}
+
+    def test_retries_rate_limit_honouring_retry_after(self, client):
+        http = MagicMock()
+        http.get = AsyncMock(side_effect=[
+            httpx.Response(429, headers={"Retry-After": "2"}),
+            httpx.Response(200, json=self.PAYLOAD),
+        ])
+        sleep = AsyncMock()
+        with patch("app.services.otreeba_client.get_http_client", return_value=http), \
+                patch("app.services.otreeba_client.asyncio.sleep", sleep):
+            result = run_async(client.get_strain_data("Blue Dream"))
+        assert result.strain_name == "Blue Dream"
+        assert http.get.await_count == 2
+        sleep.assert_awaited_once_with(2.0)
+
+    def test_retries_transport_errors_then_gives_up(self, client):
+        http = MagicMock()
+        http.get = AsyncMock(side_effect=httpx.ConnectError("down"))
+        sleep = AsyncMock()
+        with patch("app.services.otreeba_client.get_http_client", return_value=http), \
+                patch("app.services.otreeba_client.asyncio.sleep", sleep):
+            assert run_async(client.get_strain_data("Blue Dream")) is None
+        assert http.get.await_count == 3
+        assert sleep.await_count == 2
+        # Jittered exponential backoff
+        first, second = (c.args[0] for c in sleep.await_args_list)
+        assert 0.25 <= first <= 0.5
+        assert 0.5 <= second <= 1.0
+
+    def test_client_errors_not_retried(self, client):
+        http = _mock_http(httpx.Response(404))
+        with patch("app.services.otreeba_client.get_http_client", return_value=http):
+            assert run_async(client.get_strain_data("Blue Dream")) is None
+        assert http.get.await_count == 1
+
+
+class TestBatch:
+
+    def test_preserves_order_and_maps_errors(self, client):
+        async def fake(name):
+            if name == "boom":
+                raise RuntimeError("upstream")
+            return None if name == "missing" else name.upper()
+
+        with patch.object(client, "get_strain_data", side_effect=fake):
+            results = run_async(client.get_strain_data_batch(["a", "boom", "missing", "b"]))
+        assert results == ["A", None, None, "B"]
+
+    def test_bounds_concurrency(self, client):
+        in_flight = 0
+        peak = 0
+
+        async def fake(name):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return name
+
+        with patch.object(client, "get_strain_data", side_effect=fake), \
+                patch("app.services.otreeba_client.UPSTREAM_BATCH_CONCURRENCY", 3):
+            results = run_async(client.get_strain_data_batch([str(i) for i in range(10)]))
+        assert results == [str(i) for i in range(10)]
+        assert peak == 3
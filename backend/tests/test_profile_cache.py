@@ -39,6 +39,17 @@ class TestGetCachedProfile:
         assert result["source"] == "database"
         session.close.assert_called_once()
 
+    @patch("app.services.profile_cache.SessionLocal")
+    def test_repeat_lookup_served_in_process(self, mock_session_cls, cache_service, mock_profile):
+        session = MagicMock()
+        mock_session_cls.return_value = session
+        session.query.return_value.filter.return_value.first.return_value = mock_profile
+
+        first = cache_service.get_cached_profile("Blue Dream")
+        second = cache_service.get_cached_profile("blue dream")
+        assert first == second
+        mock_session_cls.assert_called_once()
+
     @patch("app.services.profile_cache.SessionLocal")
     def test_not_found(self, mock_session_cls, cache_service):
         session = MagicMock()
@@ -49,6 +60,47 @@ class TestGetCachedProfile:
         assert result is None
         session.close.assert_called_once()
 
+    @patch("app.services.profile_cache.SessionLocal")
+    def test_miss_cached_until_saved(self, mock_session_cls, cache_service, mock_profile):
+        session = MagicMock()
+        mock_session_cls.return_value = session
+        session.query.return_value.filter.return_value.first.return_value = None
+
+        assert cache_service.get_cached_profile("Blue Dream") is None
+        assert cache_service.get_cached_profile("blue dream") is None
+        mock_session_cls.assert_called_once()
+
+        cache_service.save_profile(
+            strain_name="Blue Dream",
+            terpenes={"myrcene": 0.5},
+            totals=Totals(),
+            category="BLUE",
+            source="page",
+        )
+        session.query.return_value.filter.return_value.first.return_value = mock_profile
+        assert cache_service.get_cached_profile("Blue Dream")["category"] == "BLUE"
+
+
+class TestGetCachedProfiles:
+
+    @patch("app.services.profile_cache.SessionLocal")
+    def test_single_query_for_batch(self, mock_session_cls, cache_service, mock_profile):
+        session = MagicMock()
+        mock_session_cls.return_value = session
+        session.query.return_value.filter.return_value.all.return_value = [mock_profile]
+
+        result = cache_service.get_cached_profiles(["Blue Dream", "BLUE DREAM", "Unknown Kush"])
+        assert set(result) == {"Blue Dream", "BLUE DREAM"}
+        assert result["Blue Dream"]["category"] == "BLUE"
+        mock_session_cls.assert_called_once()
+        session.close.assert_called_once()
+
+        # Both the hit and the miss are now answered in-process
+        again = cache_service.get_cached_profiles(["blue dream", "unknown kush"])
+        assert set(again) == {"blue dream"}
+        assert cache_service.get_cached_profile("Unknown Kush") is None
+        mock_session_cls.assert_called_once()
+
 
 class TestSaveProfile:
 
@@ -84,8 +136,30 @@ class TestSaveProfile:
         )
         assert result is True
         assert mock_profile.terp_vector == {"myrcene": 0.6}
+        assert datetime.fromisoformat(mock_profile.provenance["updated_at"]).tzinfo is not None
         session.commit.assert_called_once()
 
+    @patch("app.services.profile_cache.SessionLocal")
+    def test_update_refreshes_in_process_cache(self, mock_session_cls, cache_service, mock_profile):
+        session = MagicMock()
+        mock_session_cls.return_value = session
+        session.query.return_value.filter.return_value.first.return_value = mock_profile
+
+        cache_service.get_cached_profile("Blue Dream")
+        cache_service.save_profile(
+            strain_name="Blue Dream",
+            terpenes={"myrcene": 0.6},
+            totals=Totals(thc=0.25),
+            category="BLUE",
+            source="coa",
+        )
+        session.query.reset_mock()
+
+        result = cache_service.get_cached_profile("Blue Dream")
+        assert result["terpenes"] == {"myrcene": 0.6}
+        assert result["totals"].thc == 0.25
+        session.query.assert_not_called()
+
     @patch("app.services.profile_cache.SessionLocal")
     def test_exception_rollback(self, mock_session_cls, cache_service):
         session = MagicMock()
@@ -104,13 +178,52 @@ class TestSaveProfile:
         session.rollback.assert_called_once()
 
 
+class TestSaveProfilesBulk:
+
+    @patch("app.services.profile_cache.SessionLocal")
+    def test_one_query_one_commit(self, mock_session_cls, cache_service, mock_profile):
+        session = MagicMock()
+        mock_session_cls.return_value = session
+        session.query.return_value.filter.return_value.all.return_value = [mock_profile]
+
+        result = cache_service.save_profiles_bulk([
+            dict(strain_name="Blue Dream", terpenes={"myrcene": 0.6}, totals=Totals(thc=0.25),
+                 category="BLUE", source="coa"),
+            dict(strain_name="New Strain", terpenes={"limonene": 0.4}, totals=Totals(),
+                 category="YELLOW", source="page"),
+        ])
+        assert result is True
+        assert mock_profile.terp_vector == {"myrcene": 0.6}
+        session.add.assert_called_once()
+        session.commit.assert_called_once()
+        session.query.assert_called_once()
+
+        # The updated profile is written through to the in-process cache
+        session.query.reset_mock()
+        assert cache_service.get_cached_profile("Blue Dream")["terpenes"] == {"myrcene": 0.6}
+        session.query.assert_not_called()
+
+    @patch("app.services.profile_cache.SessionLocal")
+    def test_failure_rolls_back(self, mock_session_cls, cache_service):
+        session = MagicMock()
+        mock_session_cls.return_value = session
+        session.query.return_value.filter.return_value.all.return_value = []
+        session.commit.side_effect = Exception("DB error")
+
+        result = cache_service.save_profiles_bulk([
+            dict(strain_name="Bad Strain", terpenes={}, totals=Totals(), category="BLUE", source="page"),
+        ])
+        assert result is False
+        session.rollback.assert_called_once()
+
+
 class TestGetCachedProfileWithAliases:
 
     @patch("app.services.profile_cache.SessionLocal")
     def test_direct_match_returned(self, mock_session_cls, cache_service, mock_profile):
         session = MagicMock()
         mock_session_cls.return_value = session
-        session.query.return_value.filter.return_value.first.return_value = mock_profile
+        session.query.return_value.filter.return_value.all.return_value = [mock_profile]
 
         result = cache_service.get_cached_profile_with_aliases("Blue Dream")
         assert result is not None
@@ -120,12 +233,30 @@ class TestGetCachedProfileWithAliases:
     def test_alias_fallback(self, mock_session_cls, cache_service, mock_profile):
         session = MagicMock()
         mock_session_cls.return_value = session
-        # First call (direct) returns None, second call (alias) returns profile
-        session.query.return_value.filter.return_value.first.side_effect = [None, mock_profile]
+        # Only the alias has a row; direct name and alias share one query
+        session.query.return_value.filter.return_value.all.return_value = [mock_profile]
 
-        with patch.object(cache_service, "resolve_strain_aliases", return_value=["blue dream alt"]):
+        with patch.object(cache_service, "resolve_strain_aliases", return_value=["blue dream"]):
             result = cache_service.get_cached_profile_with_aliases("Blue Dream Alt")
             assert result is not None
+        mock_session_cls.assert_called_once()
+
+    @patch("app.services.profile_cache.SessionLocal")
+    def test_direct_match_preferred_over_alias(self, mock_session_cls, cache_service, mock_profile):
+        alias_profile = MagicMock()
+        alias_profile.strain_normalized = "bd"
+        alias_profile.terp_vector = {"limonene": 0.5}
+        alias_profile.totals = {}
+        alias_profile.category = "YELLOW"
+        alias_profile.provenance = {}
+        alias_profile.created_at = None
+        session = MagicMock()
+        mock_session_cls.return_value = session
+        session.query.return_value.filter.return_value.all.return_value = [alias_profile, mock_profile]
+
+        with patch.object(cache_service, "resolve_strain_aliases", return_value=["bd"]):
+            result = cache_service.get_cached_profile_with_aliases("Blue Dream")
+        assert result["category"] == "BLUE"
 
     @patch("app.services.profile_cache.SessionLocal")
     def test_no_match_no_alias(self, mock_session_cls, cache_service):
@@ -159,3 +290,46 @@ class TestGetAllCachedStrains:
 
         result = cache_service.get_all_cached_strains()
         assert result == []
+
+
+class TestAliasMap:
+
+    def test_loaded_once_and_shared(self, tmp_path, monkeypatch):
+        from app.services import profile_cache
+        alias_file = tmp_path / "strain_alias_map.json"
+        alias_file.write_text('{"bluedream": "Blue Dream"}')
+        monkeypatch.setattr(profile_cache, "ALIAS_MAP_PATH", alias_file)
+        monkeypatch.setattr(profile_cache, "_alias_map", None)
+
+        first = ProfileCacheService()
+        assert first.resolve_strain_aliases("Blue-Dream!") == []  # same normalized name
+        # Canonical names are stored normalized
+        assert first._load_alias_map() == {"bluedream": "blue dream"}
+
+        alias_file.write_text('{}')
+        # A second instance reuses the already-parsed map
+        assert ProfileCacheService()._load_alias_map() is first._load_alias_map()
+
+    def test_resolves_alias(self, tmp_path, monkeypatch):
+        from app.services import profile_cache
+        alias_file = tmp_path / "strain_alias_map.json"
+        alias_file.write_text('{"gsc": "Girl Scout Cookies"}')
+        monkeypatch.setattr(profile_cache, "ALIAS_MAP_PATH", alias_file)
+        monkeypatch.setattr(profile_cache, "_alias_map", None)
+
+        service = ProfileCacheService()
+        service.warm()
+        assert service.resolve_strain_aliases("G.S.C.") == ["girl scout cookies"]
+        assert service.resolve_strain_aliases("Unknown") == []
+
+    def test_invalid_file_gives_empty_map(self, tmp_path, monkeypatch):
+        from app.services import profile_cache
+        alias_file = tmp_path / "strain_alias_map.json"
+        alias_file.write_text("not json")
+        monkeypatch.setattr(profile_cache, "ALIAS_MAP_PATH", alias_file)
+        monkeypatch.setattr(profile_cache, "_alias_map", None)
+        assert ProfileCacheService()._load_alias_map() == {}
+
+    def test_name_to_stub(self, cache_service):
+        assert cache_service._name_to_stub(" Blue Dream #1 ") == "bluedream1"
+        assert cache_service._name_to_stub("Café Kush") == "cafkush"
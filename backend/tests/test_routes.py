@@ -115,6 +115,19 @@ class TestAnalyzeUrlEndpoint:
         assert resp.status_code == 200
         assert resp.json()["strain_guess"] == "Cached Strain"
 
+    @patch("app.api.routes.StrainAnalyzer")
+    def test_analyze_url_cache_key_canonical(self, mock_analyzer_cls, client, mock_cache):
+        mock_analyzer = AsyncMock()
+        mock_analyzer.analyze_url = AsyncMock(return_value=self._make_result())
+        mock_analyzer_cls.return_value = mock_analyzer
+
+        client.post("/api/analyze-url", json={"url": "https://Example.com/strain?utm_source=ig#top"})
+        client.post("/api/analyze-url", json={"url": "https://example.com/strain"})
+
+        keys = [c.args[0] for c in mock_cache.get.call_args_list]
+        assert len(keys) == 2
+        assert keys[0] == keys[1]
+
     @patch("app.api.routes.StrainAnalyzer")
     def test_analyze_url_value_error_404(self, mock_analyzer_cls, client):
         mock_analyzer = AsyncMock()
@@ -61,7 +61,7 @@ class TestSearchStrains:
         mock_session_cls.return_value = session
         blue_profiles = [p for p in mock_db_profiles if p.strain_normalized.startswith("blue")]
         session.query.return_value.filter.return_value.limit.return_value.all.return_value = blue_profiles
-        session.query.return_value.all.return_value = mock_db_profiles
+        session.query.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = mock_db_profiles
 
         results = cache_service.search_strains("blue")
         prefix_results = [r for r in results if r["match_type"] == "prefix"]
@@ -74,10 +74,24 @@ class TestSearchStrains:
         mock_session_cls.return_value = session
         # No prefix matches for "bleu"
         session.query.return_value.filter.return_value.limit.return_value.all.return_value = []
-        session.query.return_value.all.return_value = mock_db_profiles
+        # Trigram-index shortlist
+        session.query.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = mock_db_profiles
 
         results = cache_service.search_strains("bleu dream")
         # Should find "blue dream" via fuzzy matching
         fuzzy = [r for r in results if r["match_type"] == "fuzzy"]
         assert len(fuzzy) > 0
         assert any(r["name"] == "blue dream" for r in fuzzy)
+
+    @patch("app.services.profile_cache.SessionLocal")
+    def test_fuzzy_candidates_shortlisted_in_sql(self, mock_session_cls, cache_service):
+        session = MagicMock()
+        mock_session_cls.return_value = session
+        session.query.return_value.filter.return_value.limit.return_value.all.return_value = []
+        shortlist = session.query.return_value.filter.return_value.order_by.return_value.limit
+        shortlist.return_value.all.return_value = []
+
+        assert cache_service.search_strains("bleu dream") == []
+        # No unbounded full-table read
+        session.query.return_value.all.assert_not_called()
+        shortlist.assert_called_once_with(200)
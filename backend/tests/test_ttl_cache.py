@@ -0,0 +1,44 @@
+# Tests for app/utils/ttl_cache.py
+
+from unittest.mock import patch
+from app.utils.ttl_cache import TTLCache
+
+
+class TestTTLCache:
+
+    def test_set_and_get(self):
+        cache = TTLCache(maxsize=4, ttl=60)
+        cache.set("blue dream", {"category": "BLUE"})
+        assert cache.get("blue dream") == {"category": "BLUE"}
+
+    def test_missing_returns_default(self):
+        cache = TTLCache()
+        assert cache.get("nope") is None
+        assert cache.get("nope", "fallback") == "fallback"
+
+    def test_expired_entry_dropped(self):
+        cache = TTLCache(maxsize=4, ttl=10)
+        with patch("app.utils.ttl_cache.time.monotonic", return_value=100.0):
+            cache.set("og kush", 1)
+        with patch("app.utils.ttl_cache.time.monotonic", return_value=111.0):
+            assert cache.get("og kush") is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", 3)
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+
+    def test_pop_and_clear(self):
+        cache = TTLCache()
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.pop("a") == 1
+        assert cache.pop("a") is None
+        cache.clear()
+        assert len(cache) == 0
@@ -0,0 +1,22 @@
+# Tests for app/utils/urls.py
+
+from app.utils.urls import canonicalize_url
+
+
+class TestCanonicalizeUrl:
+
+    def test_lowercases_host_and_drops_fragment(self):
+        assert canonicalize_url("HTTPS://Shop.Example.com/p/Blue-Dream#reviews") == "https://shop.example.com/p/Blue-Dream"
+
+    def test_strips_tracking_params(self):
+        url = "https://example.com/p/gelato?utm_source=ig&utm_medium=social&fbclid=abc&variant=eighth"
+        assert canonicalize_url(url) == "https://example.com/p/gelato?variant=eighth"
+
+    def test_sorts_query_params(self):
+        assert canonicalize_url("https://example.com/p?b=2&a=1") == canonicalize_url("https://example.com/p?a=1&b=2")
+
+    def test_trailing_slash_ignored(self):
+        assert canonicalize_url("https://example.com/p/og-kush/") == canonicalize_url("https://example.com/p/og-kush")
+
+    def test_root_path(self):
+        assert canonicalize_url("https://example.com") == "https://example.com/"